@@ -0,0 +1,254 @@
+# audio_features.py
+#
+# Streams a reference audio file in fixed-size chunks and computes per-frame
+# features on the animation frame grid (same convention as Note.start_frame:
+# row i covers the audio around frame i at FPS). Animators can use these to
+# modulate emission strength or swing amplitude, and the onset envelope is
+# correlated with the MIDI note starts to find the MIDI -> audio offset.
+#
+# WAV is read with the stdlib wave module; other formats (e.g. the mp3) are
+# decoded through ffmpeg if it is installed. Memory use is bounded by the
+# chunk size, so hour-long stems are fine. Needs numpy (ships with Blender).
+#
+#   python audio_features.py song.wav --midi solarpunkFIN.mid --out song_features.npy
+
+import argparse
+import shutil
+import subprocess
+import sys
+import wave
+from pathlib import Path
+
+import numpy as np
+
+FPS = 24
+CHUNK_SECONDS = 10.0
+FFMPEG_SAMPLE_RATE = 44100
+
+# band edges in Hz -> bands [0, 200), [200, 2000), [2000, nyquist]
+BAND_EDGES = (200.0, 2000.0)
+
+# column names of the feature array, bands are appended as band_0, band_1, ...
+BASE_FEATURES = ("rms", "onset")
+
+def feature_names(band_edges=BAND_EDGES):
+    return list(BASE_FEATURES) + [f"band_{i}" for i in range(len(band_edges) + 1)]
+
+### AUDIO INPUT ###
+def _pcm_to_float(raw, sampwidth, channels):
+    """Convert interleaved PCM bytes to a mono float32 array in [-1, 1]"""
+    if sampwidth == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sampwidth == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif sampwidth == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        ints = np.where(ints >= 1 << 23, ints - (1 << 24), ints)
+        samples = ints.astype(np.float32) / float(1 << 23)
+    elif sampwidth == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / float(1 << 31)
+    else:
+        raise ValueError(f"unsupported sample width {sampwidth}")
+
+    if channels > 1:
+        samples = samples[: len(samples) // channels * channels]
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples
+
+def _wav_chunks(path, chunk_seconds):
+    with wave.open(str(path), "rb") as wav:
+        sample_rate = wav.getframerate()
+        sampwidth = wav.getsampwidth()
+        channels = wav.getnchannels()
+        chunk = max(1, int(sample_rate * chunk_seconds))
+        yield sample_rate
+        while True:
+            raw = wav.readframes(chunk)
+            if not raw:
+                return
+            yield _pcm_to_float(raw, sampwidth, channels)
+
+def _ffmpeg_chunks(path, chunk_seconds):
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError(f"{path}: only WAV can be read without ffmpeg installed")
+
+    cmd = [ffmpeg, "-v", "error", "-i", str(path), "-f", "s16le",
+           "-ac", "1", "-ar", str(FFMPEG_SAMPLE_RATE), "-"]
+    chunk_bytes = 2 * max(1, int(FFMPEG_SAMPLE_RATE * chunk_seconds))
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+    try:
+        yield FFMPEG_SAMPLE_RATE
+        while True:
+            raw = proc.stdout.read(chunk_bytes)
+            if not raw:
+                break
+            yield _pcm_to_float(raw[: len(raw) // 2 * 2], 2, 1)
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+def iter_audio_chunks(path, chunk_seconds=CHUNK_SECONDS):
+    """
+    Yield the sample rate, then mono float32 sample chunks of the audio file
+
+    Each chunk holds about chunk_seconds of audio.
+    """
+    if Path(path).suffix.lower() == ".wav":
+        return _wav_chunks(path, chunk_seconds)
+    return _ffmpeg_chunks(path, chunk_seconds)
+
+### FEATURES ###
+def _band_bins(band_edges, win, sample_rate):
+    """rfft bin ranges [(lo, hi), ...] for each band"""
+    num_bins = win // 2 + 1
+    cuts = [0] + [min(num_bins, int(round(edge * win / sample_rate))) for edge in band_edges]
+    cuts.append(num_bins)
+    return list(zip(cuts[:-1], cuts[1:]))
+
+def extract_features(path, fps=FPS, chunk_seconds=CHUNK_SECONDS, band_edges=BAND_EDGES):
+    """
+    Compute per-frame audio features, streaming the file chunk by chunk
+
+    Returns a float32 array of shape (num_frames, len(feature_names())):
+    RMS envelope, onset strength (spectral flux) and energy per band.
+    """
+    chunks = iter_audio_chunks(path, chunk_seconds)
+    sample_rate = next(chunks)
+
+    win = max(2, int(round(sample_rate / fps)))
+    window = np.hanning(win).astype(np.float32)
+    bins = _band_bins(band_edges, win, sample_rate)
+    offsets = np.arange(win)
+
+    def frame_start(i):
+        # sample index where frame i begins (works on ints and arrays)
+        return np.floor(np.asarray(i) * sample_rate / fps + 0.5).astype(np.int64)
+
+    rows = []
+    buf = np.zeros(0, dtype=np.float32)
+    buf_start = 0     # sample index of buf[0]
+    next_frame = 0
+    prev_logmag = None
+    done = False
+
+    while not done:
+        chunk = next(chunks, None)
+        if chunk is None:
+            # flush: zero pad so every frame that starts inside the audio is complete
+            done = True
+            end = buf_start + len(buf)
+            last = int(np.ceil(end * fps / sample_rate))
+            while last > 0 and frame_start(last - 1) >= end:
+                last -= 1
+            if last <= next_frame:
+                break
+            pad = int(frame_start(last - 1)) + win - end
+            buf = np.concatenate([buf, np.zeros(max(0, pad), dtype=np.float32)])
+        else:
+            buf = np.concatenate([buf, chunk])
+
+        # frames fully covered by buf
+        end = buf_start + len(buf)
+        last = int((end - win) * fps / sample_rate) + 2
+        while last > next_frame and frame_start(last - 1) + win > end:
+            last -= 1
+        if last <= next_frame:
+            continue
+
+        starts = frame_start(np.arange(next_frame, last)) - buf_start
+        frames = buf[starts[:, None] + offsets]
+
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        spec = np.abs(np.fft.rfft(frames * window, axis=1))
+        power = spec * spec / win
+        bands = [power[:, lo:hi].sum(axis=1) for lo, hi in bins]
+
+        logmag = np.log1p(spec)
+        prev = logmag[:1] if prev_logmag is None else prev_logmag[None, :]
+        flux = np.maximum(logmag - np.vstack([prev, logmag[:-1]]), 0.0).sum(axis=1)
+        prev_logmag = logmag[-1]
+
+        rows.append(np.column_stack([rms, flux] + bands).astype(np.float32))
+
+        # drop samples no later frame needs
+        next_frame = last
+        keep_from = int(frame_start(next_frame)) - buf_start
+        buf = buf[keep_from:]
+        buf_start += keep_from
+
+    if not rows:
+        return np.zeros((0, len(feature_names(band_edges))), dtype=np.float32)
+    return np.concatenate(rows)
+
+def normalize(features):
+    """Scale every feature column to [0, 1] (e.g. for emission multipliers)"""
+    peak = features.max(axis=0) if len(features) else np.ones(features.shape[1])
+    return features / np.where(peak > 0, peak, 1.0)
+
+### MIDI ALIGNMENT ###
+def note_onset_envelope(track_list, num_frames):
+    """Per-frame sum of note-on velocities across all tracks"""
+    env = np.zeros(num_frames, dtype=np.float32)
+    for notes in track_list:
+        if not notes:
+            continue
+        frames = np.array([n.start_frame for n in notes])
+        velocity = np.array([n.velocity for n in notes], dtype=np.float32)
+        inside = (frames >= 0) & (frames < num_frames)
+        np.add.at(env, frames[inside], velocity[inside])
+    return env
+
+def detect_offset(features, track_list, fps=FPS, max_offset_seconds=2.0):
+    """
+    Estimate the MIDI -> audio offset in frames by correlating the audio onset
+    strength with the note starts. audio frame = midi frame + offset.
+    """
+    onset = features[:, BASE_FEATURES.index("onset")].astype(np.float64)
+    notes = note_onset_envelope(track_list, len(onset)).astype(np.float64)
+    max_lag = int(round(max_offset_seconds * fps))
+
+    onset = onset - onset.mean()
+    notes = notes - notes.mean()
+
+    best_lag, best_score = 0, -np.inf
+    n = len(onset)
+    for lag in range(-max_lag, max_lag + 1):
+        if lag >= 0:
+            score = np.dot(onset[lag:], notes[:n - lag])
+        else:
+            score = np.dot(onset[:n + lag], notes[-lag:])
+        if score > best_score:
+            best_lag, best_score = lag, score
+    return best_lag
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="per-frame audio features")
+    arg_parser.add_argument("audio_path")
+    arg_parser.add_argument("--out", help="save the feature array as .npy")
+    arg_parser.add_argument("--midi", help="MIDI file to detect the audio offset against")
+    arg_parser.add_argument("--fps", type=int, default=FPS)
+    arg_parser.add_argument("--chunk-seconds", type=float, default=CHUNK_SECONDS)
+    args = arg_parser.parse_args(argv)
+
+    features = extract_features(args.audio_path, args.fps, args.chunk_seconds)
+    print(f"{len(features)} frames, features: {', '.join(feature_names())}")
+
+    if args.out:
+        np.save(args.out, features)
+
+    if args.midi:
+        project_root = Path(__file__).resolve().parent
+        for p in (project_root, project_root / "vendor"):
+            if str(p) not in sys.path:
+                sys.path.insert(0, str(p))
+        import mido
+        from parser import parse_midi_file
+
+        track_list = parse_midi_file(mido.MidiFile(args.midi))
+        offset = detect_offset(features, track_list, args.fps)
+        print(f"MIDI -> audio offset: {offset} frames ({offset / args.fps:+.3f} s)")
+
+if __name__ == "__main__":
+    main()
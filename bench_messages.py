@@ -0,0 +1,92 @@
+# bench_messages.py
+#
+# Measures per-message memory and the cost of the message operations that
+# dominate file loading (construction, decoding, copy, merge). Run from the
+# project root:
+#
+#   python bench_messages.py
+#
+# It first checks that the slotted message classes still behave like
+# upstream's for type() and vars() (see check_types) and exits 1 if not.
+
+import pickle
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+VENDOR_DIR = PROJECT_ROOT / "vendor"
+sys.path.insert(0, str(VENDOR_DIR))
+
+import mido
+
+MIDI_PATH = str(PROJECT_ROOT / "solarpunkFIN.mid")
+
+NAMESPACE = {
+    "mido": mido,
+    "msg": mido.Message("note_on", note=60, velocity=64, time=5),
+    "meta": mido.MetaMessage("set_tempo", tempo=500000),
+    "mid": mido.MidiFile(MIDI_PATH),
+    "MIDI_PATH": MIDI_PATH,
+}
+
+# name -> (statement, loops per timing)
+CASES = {
+    "Message()": ("mido.Message('note_on', note=60, velocity=64, time=5)", 20000),
+    "Message.from_bytes()": ("mido.Message.from_bytes([0x90, 60, 64], time=3)", 20000),
+    "msg.copy()": ("msg.copy()", 20000),
+    "msg.copy(time=...)": ("msg.copy(skip_checks=True, time=3)", 20000),
+    "meta.copy(time=...)": ("meta.copy(skip_checks=True, time=3)", 20000),
+    "msg.bytes()": ("msg.bytes()", 20000),
+    "msg == msg": ("msg == msg", 20000),
+    "MidiFile(path)": ("mido.MidiFile(MIDI_PATH)", 5),
+    "merge_tracks + iterate": ("mid._merged_track = None; list(mid)", 5),
+}
+
+def bytes_per_message(count=100000):
+    tracemalloc.start()
+    messages = [mido.Message("note_on", note=60, velocity=64, time=i) for i in range(count)]
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del messages
+    return used / count
+
+def check_types():
+    """
+    Check that the slotted message classes still look like upstream's
+
+    Messages of every type are plain Message / MetaMessage instances and
+    vars(msg) returns their attributes. Returns a list of failures.
+    """
+    note_on = mido.Message("note_on", note=60)
+    note_off = mido.Message("note_off", note=60)
+    meta = mido.MetaMessage("set_tempo", tempo=500000)
+    checks = {
+        "type(msg) is Message": type(note_on) is mido.Message,
+        "type(note_on) is type(note_off)": type(note_on) is type(note_off),
+        "type(meta) is MetaMessage": type(meta) is mido.MetaMessage,
+        "vars(msg)": vars(note_on) == {"type": "note_on", "channel": 0, "note": 60,
+                                       "velocity": 64, "time": 0},
+        "vars(meta)": vars(meta) == {"type": "set_tempo", "tempo": 500000, "time": 0},
+        "pickle round trip": pickle.loads(pickle.dumps(note_on)) == note_on,
+    }
+    return [name for name, ok in checks.items() if not ok]
+
+def main():
+    failures = check_types()
+    for failure in failures:
+        print(f"[WARN] message type check failed: {failure}")
+    if failures:
+        sys.exit(1)
+
+    for name, (stmt, number) in CASES.items():
+        best = min(timeit.repeat(stmt, globals=NAMESPACE, number=number, repeat=7)) / number
+        if best < 1e-3:
+            print(f"{name:<24} {best * 1e9:>10.0f} ns")
+        else:
+            print(f"{name:<24} {best * 1e3:>10.2f} ms")
+    print(f"{'memory per note_on':<24} {bytes_per_message():>10.0f} bytes")
+
+if __name__ == "__main__":
+    main()
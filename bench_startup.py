@@ -0,0 +1,62 @@
+# bench_startup.py
+#
+# Measures how long a fresh Python process takes to import mido (and the
+# project modules) so we can check the cost paid by every short-lived
+# worker process. Run from the project root:
+#
+#   python bench_startup.py [runs]
+
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+VENDOR_DIR = PROJECT_ROOT / "vendor"
+
+SETUP = f"import sys; sys.path[:0] = [{str(PROJECT_ROOT)!r}, {str(VENDOR_DIR)!r}]; "
+
+# name -> statement run in a fresh interpreter
+CASES = {
+    "baseline (python only)": "pass",
+    "import mido (file-only)": "import mido",
+    "import parser (file-only)": "import parser",
+    "import mido + parse MIDI": (
+        "import mido, parser; "
+        f"parser.parse_midi_file(mido.MidiFile({str(PROJECT_ROOT / 'solarpunkFIN.mid')!r}))"
+    ),
+    # touches everything the old eager __init__ used to import
+    "import mido (everything)": (
+        "import mido; mido.ports; mido.sockets; mido.Parser; "
+        "mido.read_syx_file; mido.version_info; mido.backend"
+    ),
+}
+
+def time_case(stmt, runs):
+    """Time `runs` fresh interpreters executing stmt, return list of ms"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", SETUP + stmt], check=True)
+        times.append((time.perf_counter() - start) * 1000.0)
+    return times
+
+def main(runs=20):
+    results = {}
+    for name, stmt in CASES.items():
+        results[name] = time_case(stmt, runs)
+
+    baseline = statistics.median(results["baseline (python only)"])
+    print(f"{'case':<28} {'median ms':>10} {'min ms':>8} {'over python':>12}")
+    for name, times in results.items():
+        med = statistics.median(times)
+        print(f"{name:<28} {med:>10.1f} {min(times):>8.1f} {med - baseline:>12.1f}")
+
+    lazy = statistics.median(results["import mido (file-only)"])
+    eager = statistics.median(results["import mido (everything)"])
+    print(f"\nfile-only import saves {eager - lazy:.1f} ms per process "
+          f"({(eager - lazy) / max(eager - baseline, 1e-9):.0%} of mido import cost)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
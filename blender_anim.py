@@ -1,6 +1,77 @@
 import bpy
 from math import radians
 
+from instruments import (
+    BASS_MAPPING,
+    DRUM_MAPPING,
+    HARP_MAPPING,
+    HARP_PARAMS,
+    HARP_STRING_MODE,
+    HARP_STRING_MODEL,
+    HARP_STRINGS,
+    ORGAN_MAPPING,
+    TRUMPET_PITCH_RANGE,
+)
+from notes import Note
+from patterns import REACH, find_patterns
+from string_vibration import hit_table, merge_hits, shape_key_values
+
+### CLEARING ###
+# helper function for clearing animations
+def clear_animation_for_objects(names):
+    for name in names:
+        obj = bpy.data.objects.get(name)
+        if obj:
+            # clear animations
+            obj.animation_data_clear()
+            scn = bpy.context.scene
+            scn.frame_set(1)
+
+            # reset obj
+            obj.rotation_mode = 'XYZ'
+            obj.rotation_euler = (0.0, 0.0, 0.0)
+            obj.location = (0.0, 0.0, 0.0)
+
+    bpy.context.view_layer.update()
+
+# helper function for clearing glow animations
+def clear_animation_for_glow(names):
+    for name in names:
+        obj = bpy.data.objects.get(name)
+        if obj:
+            # clear animations
+            node_tree = obj.material_slots[0].material.node_tree
+            node_tree.animation_data_clear()
+            scn = bpy.context.scene
+            scn.frame_set(1)
+
+            # reset glow value
+            bsdf = next((n for n in node_tree.nodes if n.type == 'BSDF_PRINCIPLED'), None)
+            socket = bsdf.inputs["Emission Strength"]
+            socket.default_value = 1.0
+
+# helper function for clearing shape key animations
+def clear_animation_for_shapekeys(names):
+    for name in names:
+        obj = bpy.data.objects.get(name)
+        if obj:
+            # clear animations
+            shape_keys = obj.data.shape_keys
+            shape_keys.animation_data_clear()
+            scn = bpy.context.scene
+            scn.frame_set(1)
+
+            # reset shape key values
+            kb = shape_keys.key_blocks
+            kb[1].value = 0.0
+            kb[2].value = 0.0
+
+            # drop the analytic hit table
+            for prop in (HIT_FRAMES_PROP, HIT_AMPS_PROP):
+                if prop in obj:
+                    del obj[prop]
+
+
 ### HARP HAMMERS ###
 def animate_hammer_harp(obj, notes, swing_deg, rebound_deg, axis):
     """
@@ -116,6 +187,51 @@ def animate_string_vibrate_2keys(obj, notes, key_up=1, key_down=2,
         up.keyframe_insert("value", frame=end_f)
         down.keyframe_insert("value", frame=end_f)
 
+### ANALYTIC STRINGS ###
+# custom properties holding each string's hit table (saved with the .blend)
+HIT_FRAMES_PROP = "string_hit_frames"
+HIT_AMPS_PROP = "string_hit_amps"
+
+def add_string_hits(obj, notes):
+    """
+    Add notes to a string's hit table, its shape keys then follow the damped
+    oscillator in string_vibration.py (no keyframes)
+    """
+    frames, amps = hit_table(notes, HARP_STRING_MODEL["amp"])
+    if HIT_FRAMES_PROP in obj:
+        frames, amps = merge_hits(obj[HIT_FRAMES_PROP], obj[HIT_AMPS_PROP], frames, amps)
+    obj[HIT_FRAMES_PROP] = frames.tolist()
+    obj[HIT_AMPS_PROP] = amps.tolist()
+    register_string_handler()
+
+@bpy.app.handlers.persistent
+def update_strings(scene, depsgraph=None):
+    """frame_change_pre handler: set the string shape keys from their hit tables"""
+    frame = scene.frame_current + scene.frame_subframe
+    for name in HARP_STRINGS:
+        obj = bpy.data.objects.get(name)
+        if obj is None or HIT_FRAMES_PROP not in obj:
+            continue
+
+        up, down = shape_key_values(frame, obj[HIT_FRAMES_PROP], obj[HIT_AMPS_PROP],
+                                    HARP_STRING_MODEL["period"], HARP_STRING_MODEL["decay"])
+        kb = obj.data.shape_keys.key_blocks
+        kb["Key 1"].value = up
+        kb["Key 2"].value = down
+
+def register_string_handler():
+    """
+    (Re-)register update_strings, replacing the one from an earlier reload
+
+    Handlers are not saved in the .blend: for command line renders run e.g.
+    blender -b scene.blend --python-expr "import blender_anim; blender_anim.register_string_handler()" -a
+    with the project on sys.path.
+    """
+    handlers = bpy.app.handlers.frame_change_pre
+    for handler in [h for h in handlers if getattr(h, "__name__", "") == "update_strings"]:
+        handlers.remove(handler)
+    handlers.append(update_strings)
+
 ### HARP ###
 def animate_harp(track_list, track_id):
     """
@@ -123,59 +239,12 @@ def animate_harp(track_list, track_id):
     """
     harp_notes = track_list[track_id]
 
-    # map harp pitches to harp string objects in Blender (3 octaves from C3 to B5)
-    harp_mapping = {
-        60: {"hammer": "Hammer.001", "string": "String.001"}, # C3
-        61: {"hammer": "Hammer.002", "string": "String.002"}, # C#3
-        62: {"hammer": "Hammer.003", "string": "String.003"}, # D3
-        63: {"hammer": "Hammer.004", "string": "String.004"}, # D#3
-        64: {"hammer": "Hammer.005", "string": "String.005"}, # E3
-        65: {"hammer": "Hammer.006", "string": "String.006"}, # F3
-        66: {"hammer": "Hammer.007", "string": "String.007"}, # F#3
-        67: {"hammer": "Hammer.008", "string": "String.008"}, # G3
-        68: {"hammer": "Hammer.009", "string": "String.009"}, # G#3
-        69: {"hammer": "Hammer.010", "string": "String.010"}, # A3
-        70: {"hammer": "Hammer.011", "string": "String.011"}, # A#3
-        71: {"hammer": "Hammer.012", "string": "String.012"}, # B3
-        72: {"hammer": "Hammer.013", "string": "String.013"}, # C4
-        73: {"hammer": "Hammer.014", "string": "String.014"}, # C#4
-        74: {"hammer": "Hammer.015", "string": "String.015"}, # D4
-        75: {"hammer": "Hammer.016", "string": "String.016"}, # D#4
-        76: {"hammer": "Hammer.017", "string": "String.017"}, # E4
-        77: {"hammer": "Hammer.018", "string": "String.018"}, # F4
-        78: {"hammer": "Hammer.019", "string": "String.019"}, # F#4
-        79: {"hammer": "Hammer.020", "string": "String.020"}, # G4
-        80: {"hammer": "Hammer.021", "string": "String.021"}, # G#4
-        81: {"hammer": "Hammer.022", "string": "String.022"}, # A4
-        82: {"hammer": "Hammer.023", "string": "String.023"}, # A#4
-        83: {"hammer": "Hammer.024", "string": "String.024"}, # B4
-        84: {"hammer": "Hammer.025", "string": "String.025"}, # C5
-        85: {"hammer": "Hammer.026", "string": "String.026"}, # C#5
-        86: {"hammer": "Hammer.027", "string": "String.027"}, # D5
-        87: {"hammer": "Hammer.028", "string": "String.028"}, # D#5
-        88: {"hammer": "Hammer.029", "string": "String.029"}, # E5
-        89: {"hammer": "Hammer.030", "string": "String.030"}, # F5
-        90: {"hammer": "Hammer.031", "string": "String.031"}, # F#5
-        91: {"hammer": "Hammer.032", "string": "String.032"}, # G5
-        92: {"hammer": "Hammer.033", "string": "String.033"}, # G#5
-        93: {"hammer": "Hammer.034", "string": "String.034"}, # A5
-        94: {"hammer": "Hammer.035", "string": "String.035"}, # A#5
-        95: {"hammer": "Hammer.036", "string": "String.036"}  # B5
-    }
-
-    # parameters for harp hammer animation
-    harp_params = {
-        "swing_deg": -7.0,    # degrees the hammer swings down on hit
-        "rebound_deg": -15.0, # degrees the hammer rebounds after hit
-        "axis": "X",          # rotation axis
-    }
-
     notes_by_pitch = {}
     for note in harp_notes:
         notes_by_pitch.setdefault(note.pitch, []).append(note)
 
     # for each pitch that we know how to animate, apply animations
-    for pitch, cfg in harp_mapping.items():
+    for pitch, cfg in HARP_MAPPING.items():
         if pitch not in notes_by_pitch:
             continue # skip unmapped pitches
 
@@ -194,11 +263,14 @@ def animate_harp(track_list, track_id):
         animate_hammer_harp(
             obj=hammer_obj,
             notes=notes_by_pitch[pitch],
-            **harp_params
+            **HARP_PARAMS
         )
         
         # animate string
         string_obj = bpy.data.objects[string_name]
+        if HARP_STRING_MODE == "analytic":
+            add_string_hits(string_obj, notes_by_pitch[pitch])
+            continue
         animate_string_vibrate_2keys(
             obj=string_obj,
             notes=notes_by_pitch[pitch],
@@ -335,33 +407,12 @@ def animate_drums(track_list, track_id):
     """
     drum_notes = track_list[track_id]
 
-    # map drum pitches to drum objects in Blender
-    drum_mapping = {
-        36: {"hammer": "Kick_Stick", "swing_deg": 14.0, "rebound_deg": 10.0,
-                "drum": "Kick", "hit_dist": 0.01, "rebound_dist": 0.005},
-
-        40: {"hammer": "Snare_Stick", "swing_deg": -12.0, "rebound_deg": -10.0,
-                "drum": "Snare", "hit_dist": 0.01, "rebound_dist": 0.005},
-
-        42: {"hammer": "HiHat_Stick", "swing_deg": -15.0, "rebound_deg": -11.0,
-                "drum": "HiHat", "hit_dist": 0.01, "rebound_dist": 0.005},
-
-        43: {"hammer": "TomLo_Stick", "swing_deg": 18.0, "rebound_deg": 14.0,
-                "drum": "TomLo", "hit_dist": 0.01, "rebound_dist": 0.005},
-
-        45: {"hammer": "TomHi_Stick", "swing_deg": 18.0, "rebound_deg": 10.0,
-                "drum": "TomHi", "hit_dist": 0.01, "rebound_dist": 0.005},
-
-        49: {"hammer": "Crash_Stick", "swing_deg": -17.0, "rebound_deg": -14.0,
-                "drum": "Crash", "hit_dist": 0.01, "rebound_dist": 0.005}
-    }
-
     notes_by_pitch = {}
     for note in drum_notes:
         notes_by_pitch.setdefault(note.pitch, []).append(note)
 
     # for each pitch that we know how to animate, apply animations
-    for pitch, cfg in drum_mapping.items():
+    for pitch, cfg in DRUM_MAPPING.items():
         if pitch not in notes_by_pitch:
             continue # skip unmapped pitches
 
@@ -429,50 +480,13 @@ def animate_organ(track_list, track_id):
     """
     organ_notes = track_list[track_id]
     
-    organ_mapping = {
-        # map organ pitches to Blender objects
-        57: {"piston": "Piston.001", "glow": "Filament.001"}, # A3
-        58: {"piston": "Piston.002", "glow": "Filament.002"}, # A#3
-        59: {"piston": "Piston.003", "glow": "Filament.003"}, # B3
-        60: {"piston": "Piston.004", "glow": "Filament.004"}, # C4
-        61: {"piston": "Piston.005", "glow": "Filament.005"}, # C#4
-
-        62: {"piston": "Piston.006", "glow": "Filament.006"}, # D4
-        63: {"piston": "Piston.007", "glow": "Filament.007"}, # D#4
-        64: {"piston": "Piston.008", "glow": "Filament.008"}, # E4
-        65: {"piston": "Piston.009", "glow": "Filament.009"}, # F4
-        66: {"piston": "Piston.010", "glow": "Filament.010"}, # F#4
-        67: {"piston": "Piston.011", "glow": "Filament.011"}, # G4
-
-        68: {"piston": "Piston.012", "glow": "Filament.012"}, # G#4
-        69: {"piston": "Piston.013", "glow": "Filament.013"}, # A4
-        70: {"piston": "Piston.014", "glow": "Filament.014"}, # A#4
-        71: {"piston": "Piston.015", "glow": "Filament.015"}, # B4
-        72: {"piston": "Piston.016", "glow": "Filament.016"}, # C5
-        73: {"piston": "Piston.017", "glow": "Filament.017"}, # C#5
-        74: {"piston": "Piston.018", "glow": "Filament.018"}, # D5
-
-        75: {"piston": "Piston.019", "glow": "Filament.019"}, # D#5
-        76: {"piston": "Piston.020", "glow": "Filament.020"}, # E5
-        77: {"piston": "Piston.021", "glow": "Filament.021"}, # F5
-        78: {"piston": "Piston.022", "glow": "Filament.022"}, # F#5
-        79: {"piston": "Piston.023", "glow": "Filament.023"}, # G5
-        80: {"piston": "Piston.024", "glow": "Filament.024"}, # G#5
-
-        81: {"piston": "Piston.025", "glow": "Filament.025"}, # A5
-        82: {"piston": "Piston.026", "glow": "Filament.026"}, # A#5
-        83: {"piston": "Piston.027", "glow": "Filament.027"}, # B5
-        84: {"piston": "Piston.028", "glow": "Filament.028"}, # C6
-        85: {"piston": "Piston.029", "glow": "Filament.029"}, # C#6
-    }
-
     # bucket notes by pitch once
     notes_by_pitch = {}
     for note in organ_notes:
         notes_by_pitch.setdefault(note.pitch, []).append(note)
 
     # piston motion
-    for pitch, cfg in organ_mapping.items():
+    for pitch, cfg in ORGAN_MAPPING.items():
         if pitch not in notes_by_pitch:
             continue
         
@@ -512,39 +526,12 @@ def animate_bass(track_list, track_id):
     # Implementation would go here
     bass_notes = track_list[track_id]
 
-    bass_mapping = {
-        47: "Core.001", # A2
-        48: "Core.002", # A#2
-        49: "Core.003", # B2
-        50: "Core.004", # C3
-        51: "Core.005", # C#3
-        52: "Core.006", # D3
-        53: "Core.007", # D#3
-        54: "Core.008", # E3
-        55: "Core.009", # F3
-        56: "Core.010", # F#3
-        57: "Core.011", # G3
-        58: "Core.012", # G#3
-        59: "Core.013", # A3
-        60: "Core.014", # A#3
-        61: "Core.015", # B3
-        62: "Core.016", # C4
-        63: "Core.017", # C#4
-        64: "Core.018", # D4
-        65: "Core.019", # D#4
-        66: "Core.020", # E4
-        67: "Core.021", # F4
-        68: "Core.022", # F#4
-        69: "Core.023", # G4
-        70: "Core.024"  # G#4
-    }
-
     # bucket notes by pitch
     notes_by_pitch = {}
     for note in bass_notes:
         notes_by_pitch.setdefault(note.pitch, []).append(note)
 
-    for pitch, obj_name in bass_mapping.items():
+    for pitch, obj_name in BASS_MAPPING.items():
         if pitch not in notes_by_pitch:
             continue
 
@@ -572,10 +559,14 @@ def map_pitch(p, pmin, pmax, amin, amax):
     return amin + t * (amax - amin)
 
 ### TRUMPET LASER ###
-def animate_trumpet_laser(track_list, track_id, obj_num):
+def animate_trumpet_laser(track_list, track_id, obj_num,
+                          prev_end_frame=None, next_start_frame=None, hide_at_start=True):
     """
     - Laser appears on note-on, disappears on note-off (viewport + render)
     - Trumpet + laser rotate on X and Z within bounds, then return to rest after note-off
+
+    When animating window by window, prev_end_frame / next_start_frame are the
+    end of the note before and the start of the note after this window.
     """
 
     # define object names
@@ -590,7 +581,7 @@ def animate_trumpet_laser(track_list, track_id, obj_num):
     for name in trumpet_names:
         obj = bpy.data.objects.get(name)
         if obj is None:
-            print(f"[WARN] Missing objects: trumpet={trumpet_name!r} laser={laser_name!r}")
+            print(f"[WARN] Object {name!r} not found in Blender scene, skipping.")
             return
         else: trumpet_objects.append(obj)
 
@@ -601,19 +592,23 @@ def animate_trumpet_laser(track_list, track_id, obj_num):
     notes = sorted(track_list[track_id], key=lambda n: n.start_frame)
 
     # start laser hidden
-    L.hide_viewport = True
-    L.hide_render = True
-    L.keyframe_insert("hide_viewport", frame=1)
-    L.keyframe_insert("hide_render", frame=1)
+    if hide_at_start:
+        L.hide_viewport = True
+        L.hide_render = True
+        L.keyframe_insert("hide_viewport", frame=1)
+        L.keyframe_insert("hide_render", frame=1)
 
     # reference rotations
     rest_GX = GX.rotation_euler.copy()
     rest_GZ = GZ.rotation_euler.copy()
 
+    window_prev_end_frame = prev_end_frame
+    window_next_start_frame = next_start_frame
+
     for i in range(len(notes)):
         # relevant frames of note before and after
-        prev_end_frame = None
-        next_start_frame = None
+        prev_end_frame = window_prev_end_frame
+        next_start_frame = window_next_start_frame
         if (i-1 >= 0):
             prev_end_frame = notes[i-1].end_frame
         if (i+1 < len(notes)):
@@ -646,7 +641,7 @@ def animate_trumpet_laser(track_list, track_id, obj_num):
         L.keyframe_insert("hide_render", frame=off_frame)
         
         # --- Rotation (fixed pose) ---
-        pmin, pmax = 38, 57
+        pmin, pmax = TRUMPET_PITCH_RANGE
         x_deg = map_pitch(notes[i].pitch, pmin, pmax, -30.0, 30.0)
         z_deg = map_pitch(notes[i].pitch, pmin, pmax, -50.0, 50.0) 
 
@@ -688,6 +683,10 @@ def animate_trumpet_laser(track_list, track_id, obj_num):
             GX.keyframe_insert("rotation_euler", frame=settle_frame)
             GZ.rotation_euler = rest_GZ
             GZ.keyframe_insert("rotation_euler", frame=settle_frame)
+
+    # leave the gyros at rest, the next call (e.g. next streaming window) reads it
+    GX.rotation_euler = rest_GX
+    GZ.rotation_euler = rest_GZ
         
     bpy.context.view_layer.update()
 
@@ -728,4 +727,182 @@ def animate_glow(obj, notes, slot, on_strength, off_strength):
 
         # turn off at settle frame
         socket.default_value = off_strength
-        socket.keyframe_insert("default_value", frame=settle_frame)
\ No newline at end of file
+        socket.keyframe_insert("default_value", frame=settle_frame)
+
+### STREAMING ###
+def animate_streaming(windows, track_ids):
+    """
+    Animate every instrument window by window
+
+    - windows: iterable of (frame_start, frame_end, track_list, next_starts)
+      as yielded by stream.stream_windows
+    - track_ids: instrument -> track index (instruments.TRACK_IDS)
+
+    Only one window of notes is alive at a time, so memory stays flat for
+    arbitrarily long recordings.
+    """
+    trumpets = [(track_ids["trumpet.001"], ".001"), (track_ids["trumpet.002"], ".002")]
+    prev_end_frames = {}
+
+    for frame_start, frame_end, track_list, next_starts in windows:
+        animate_drums(track_list=track_list, track_id=track_ids["drums"])
+        animate_harp(track_list=track_list, track_id=track_ids["harp"])
+        animate_organ(track_list=track_list, track_id=track_ids["organ"])
+        animate_bass(track_list=track_list, track_id=track_ids["bass"])
+
+        # the trumpet decides when to return to rest from its neighbouring notes
+        for track_id, obj_num in trumpets:
+            notes = track_list[track_id]
+            if not notes:
+                continue
+            animate_trumpet_laser(
+                track_list=track_list,
+                track_id=track_id,
+                obj_num=obj_num,
+                prev_end_frame=prev_end_frames.get(track_id),
+                next_start_frame=next_starts[track_id],
+                hide_at_start=track_id not in prev_end_frames,
+            )
+            prev_end_frames[track_id] = sorted(notes, key=lambda n: n.start_frame)[-1].end_frame
+
+        print(f"[stream] animated frames {frame_start}-{frame_end}")
+
+### NLA PATTERNS ###
+def _pattern_notes(rel_notes):
+    """Frame-only Note stand-ins for a pattern's relative (start, end) frames"""
+    return [Note(0, 0, 0, 0, 0.0, 0.0, start, end) for start, end in rel_notes]
+
+def animate_with_patterns(id_data, notes, windows, reach, animate, owner=None):
+    """
+    Keyframe every unique bar pattern of notes once and repeat it with NLA strips
+
+    - id_data: ID that holds the animation (object, or node tree for glows)
+    - windows: bar windows from patterns.bar_windows
+    - reach: keyframe reach of the animator (patterns.REACH)
+    - animate: callable(notes) that keyframes id_data like the direct animators
+    - owner: name the actions are prefixed with, default id_data.name (material
+      node trees are all called "Shader Nodetree", so pass the object name)
+    """
+    patterns, placements = find_patterns(notes, windows, reach)
+    prefix = f"{owner or id_data.name}|pattern"
+
+    # drop actions left over from previous runs
+    for action in [a for a in bpy.data.actions if a.name.startswith(prefix) and a.users == 0]:
+        bpy.data.actions.remove(action)
+
+    anim = id_data.animation_data_create()
+    actions = []
+    for i, (length, rel_notes) in enumerate(patterns):
+        anim.action = None
+        animate(_pattern_notes(rel_notes))
+        action = anim.action
+        action.name = f"{prefix}.{i:03d}"
+
+        # strips only play the window, keys around it shape the curve at its edges
+        action.use_frame_range = True
+        action.frame_start = 0
+        action.frame_end = length
+        actions.append(action)
+    anim.action = None
+    if not placements:
+        return
+
+    # rest pose on a track under the patterns, so frames no strip covers (gaps,
+    # before the first and after the last) evaluate to rest instead of keeping
+    # the last evaluated value; every pattern starts at rest, so the first key
+    # of each of its channels is the rest value
+    rest = bpy.data.actions.new(f"{prefix}.rest")
+    for fcurve in actions[0].fcurves:
+        rest_fcurve = rest.fcurves.new(fcurve.data_path, index=fcurve.array_index)
+        value = fcurve.keyframe_points[0].co[1]
+        rest_fcurve.keyframe_points.insert(placements[0][0], value)
+        rest_fcurve.keyframe_points.insert(placements[-1][1], value)
+    base = anim.nla_tracks.new()
+    base.name = "rest"
+    strip = base.strips.new(rest.name, placements[0][0], rest)
+    strip.extrapolation = 'HOLD'
+
+    track = anim.nla_tracks.new()
+    track.name = "patterns"
+    for start, end, i in placements:
+        strip = track.strips.new(f"{actions[i].name}@{start}", start, actions[i])
+        strip.extrapolation = 'NOTHING'
+
+def animate_drums_patterns(track_list, track_id, windows):
+    """
+    Same as animate_drums, but repeated bars become NLA strips (see patterns.py)
+    """
+    notes_by_pitch = {}
+    for note in track_list[track_id]:
+        notes_by_pitch.setdefault(note.pitch, []).append(note)
+
+    for pitch, cfg in DRUM_MAPPING.items():
+        if pitch not in notes_by_pitch:
+            continue # skip unmapped pitches
+
+        # skip if obj not found in blender scene
+        hammer_name = cfg["hammer"]
+        if hammer_name not in bpy.data.objects:
+            print(f"[WARN] Object {hammer_name!r} not found in Blender scene, skipping.")
+            continue
+        drum_name = cfg["drum"]
+        if drum_name not in bpy.data.objects:
+            print(f"[WARN] Object {drum_name!r} not found in Blender scene, skipping.")
+            continue
+
+        hammer_obj = bpy.data.objects[hammer_name]
+        drum_obj = bpy.data.objects[drum_name]
+        animate_with_patterns(
+            hammer_obj, notes_by_pitch[pitch], windows, REACH["drum_hammer"],
+            lambda notes: animate_drum_hammer(
+                obj=hammer_obj,
+                notes=notes,
+                swing_deg=cfg["swing_deg"],
+                rebound_deg=cfg["rebound_deg"],
+                axis="X"
+            )
+        )
+        animate_with_patterns(
+            drum_obj, notes_by_pitch[pitch], windows, REACH["drum_body"],
+            lambda notes: animate_drum_body(
+                obj=drum_obj,
+                notes=notes,
+                hit_dist=cfg["hit_dist"],
+                rebound_dist=cfg["rebound_dist"],
+                axis="Z"
+            )
+        )
+
+def animate_bass_patterns(track_list, track_id, windows):
+    """
+    Same as animate_bass, but repeated bars become NLA strips (see patterns.py)
+    """
+    notes_by_pitch = {}
+    for note in track_list[track_id]:
+        notes_by_pitch.setdefault(note.pitch, []).append(note)
+
+    for pitch, obj_name in BASS_MAPPING.items():
+        if pitch not in notes_by_pitch:
+            continue
+
+        obj = bpy.data.objects.get(obj_name)
+        if obj is None:
+            print(f"[WARN] Bass object {obj_name!r} not found, skipping.")
+            continue
+        if not obj.material_slots or obj.material_slots[0].material is None:
+            print(f"[WARN] {obj.name!r} has no material in slot 0, skipping.")
+            continue
+
+        # glow keyframes live on the material's node tree
+        animate_with_patterns(
+            obj.material_slots[0].material.node_tree, notes_by_pitch[pitch], windows,
+            REACH["glow"],
+            lambda notes: animate_glow(
+                obj=obj,
+                notes=notes,
+                slot=0,
+                on_strength=100.0,
+                off_strength=1.0,
+            ),
+            owner=obj.name,
+        )
@@ -0,0 +1,249 @@
+# indexer.py
+#
+# Builds a local SQLite catalogue of a MIDI library so we can pick songs and
+# track -> instrument assignments without re-parsing every file.
+# Runs outside Blender:
+#
+#   python indexer.py index path/to/library --db midi_catalogue.db
+#   python indexer.py query --db midi_catalogue.db --min-pitch 60 --max-pitch 95
+#
+# Only files whose mtime or size changed since the last run are re-indexed.
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+VENDOR_DIR = PROJECT_ROOT / "vendor"
+
+for p in (PROJECT_ROOT, VENDOR_DIR):
+    sp = str(p)
+    if sp not in sys.path:
+        sys.path.insert(0, sp)
+
+import mido
+from parser import get_tempo_map, parse_midi_file
+
+MIDI_EXTENSIONS = (".mid", ".midi")
+DEFAULT_DB = "midi_catalogue.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path           TEXT PRIMARY KEY,
+    mtime          REAL NOT NULL,
+    size           INTEGER NOT NULL,
+    type           INTEGER,
+    ticks_per_beat INTEGER,
+    duration       REAL,
+    tempo_map      TEXT,
+    num_tracks     INTEGER,
+    error          TEXT
+);
+CREATE TABLE IF NOT EXISTS tracks (
+    path          TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    track_index   INTEGER NOT NULL,
+    name          TEXT,
+    note_count    INTEGER NOT NULL,
+    min_pitch     INTEGER,
+    max_pitch     INTEGER,
+    channels      TEXT,
+    max_polyphony INTEGER NOT NULL,
+    PRIMARY KEY (path, track_index)
+);
+CREATE INDEX IF NOT EXISTS tracks_pitch_range ON tracks (min_pitch, max_pitch);
+"""
+
+def open_catalogue(db_path):
+    """Open (and create if needed) the catalogue database"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+### METADATA EXTRACTION ###
+def max_polyphony(notes):
+    """Largest number of notes sounding at the same time"""
+    # note ends sort before note starts on the same tick
+    events = [(n.start_tick, 1) for n in notes] + [(n.end_tick, -1) for n in notes]
+    events.sort()
+
+    current = best = 0
+    for _, change in events:
+        current += change
+        best = max(best, current)
+    return best
+
+def describe_track(index, track, notes):
+    """Per-track metadata row for the catalogue"""
+    channels = sorted({msg.channel for msg in track if hasattr(msg, "channel")})
+    pitches = [n.pitch for n in notes]
+    return {
+        "track_index": index,
+        "name": track.name,
+        "note_count": len(notes),
+        "min_pitch": min(pitches) if pitches else None,
+        "max_pitch": max(pitches) if pitches else None,
+        "channels": json.dumps(channels),
+        "max_polyphony": max_polyphony(notes),
+    }
+
+def index_file(path):
+    """
+    Extract file and track metadata for one MIDI file (runs in a worker process)
+
+    Returns (file_row, track_rows). Files that fail to parse get a row with
+    the error message and no tracks, so they are not retried until they change.
+    Returns None if the file can no longer be read (e.g. deleted mid-run).
+    """
+    try:
+        stat = os.stat(path)
+    except OSError as e:
+        print(f"[WARN] {path}: {e}, skipping.")
+        return None
+    file_row = {"path": path, "mtime": stat.st_mtime, "size": stat.st_size}
+
+    try:
+        mid = mido.MidiFile(path)
+        track_list = parse_midi_file(mid)
+    except Exception as e:
+        file_row["error"] = f"{type(e).__name__}: {e}"
+        return file_row, []
+
+    try:
+        duration = mid.length
+    except ValueError:
+        duration = None  # type 2 (asynchronous) files have no single length
+
+    file_row.update({
+        "type": mid.type,
+        "ticks_per_beat": mid.ticks_per_beat,
+        "duration": duration,
+        "tempo_map": json.dumps(get_tempo_map(mid)),
+        "num_tracks": len(mid.tracks),
+        "error": None,
+    })
+    track_rows = [
+        describe_track(i, track, notes)
+        for i, (track, notes) in enumerate(zip(mid.tracks, track_list))
+    ]
+    return file_row, track_rows
+
+### INDEXING ###
+def find_midi_files(root):
+    """Walk root and return all MIDI file paths, sorted"""
+    found = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if name.lower().endswith(MIDI_EXTENSIONS):
+                found.append(os.path.abspath(os.path.join(dirpath, name)))
+    return sorted(found)
+
+def stale_files(conn, paths):
+    """Return paths that are new or whose mtime/size changed since indexing"""
+    known = {path: (mtime, size)
+             for path, mtime, size in conn.execute("SELECT path, mtime, size FROM files")}
+    stale = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            print(f"[WARN] {path}: {e}, skipping.")
+            continue
+        if known.get(path) != (stat.st_mtime, stat.st_size):
+            stale.append(path)
+    return stale
+
+def store(conn, file_row, track_rows):
+    """Replace the catalogue rows for one file"""
+    conn.execute("DELETE FROM files WHERE path = ?", (file_row["path"],))
+    conn.execute(
+        "INSERT INTO files VALUES (:path, :mtime, :size, :type, :ticks_per_beat,"
+        " :duration, :tempo_map, :num_tracks, :error)",
+        {"type": None, "ticks_per_beat": None, "duration": None,
+         "tempo_map": None, "num_tracks": None, **file_row},
+    )
+    conn.executemany(
+        "INSERT INTO tracks VALUES (:path, :track_index, :name, :note_count,"
+        " :min_pitch, :max_pitch, :channels, :max_polyphony)",
+        [{"path": file_row["path"], **row} for row in track_rows],
+    )
+
+def index_library(root, db_path=DEFAULT_DB, workers=None):
+    """
+    Incrementally index every MIDI file under root into the catalogue
+
+    Returns (num_indexed, num_removed).
+    """
+    conn = open_catalogue(db_path)
+    paths = find_midi_files(root)
+
+    # drop catalogue entries for files that disappeared from this directory
+    root_prefix = os.path.join(os.path.abspath(root), "")
+    present = set(paths)
+    removed = [path for (path,) in conn.execute("SELECT path FROM files")
+               if path.startswith(root_prefix) and path not in present]
+    with conn:
+        conn.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in removed])
+
+    todo = stale_files(conn, paths)
+    indexed = 0
+    if todo:
+        chunksize = max(1, len(todo) // ((workers or os.cpu_count() or 1) * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool, conn:
+            for result in pool.map(index_file, todo, chunksize=chunksize):
+                if result is None:
+                    continue
+                file_row, track_rows = result
+                if file_row.get("error"):
+                    print(f"[WARN] {file_row['path']}: {file_row['error']}")
+                store(conn, file_row, track_rows)
+                indexed += 1
+
+    conn.close()
+    return indexed, len(removed)
+
+### QUERIES ###
+def find_tracks_in_range(conn, min_pitch, max_pitch, min_notes=1):
+    """Tracks whose whole pitch range fits in [min_pitch, max_pitch]"""
+    return conn.execute(
+        "SELECT path, track_index, name, note_count, min_pitch, max_pitch, max_polyphony"
+        " FROM tracks"
+        " WHERE note_count >= ? AND min_pitch >= ? AND max_pitch <= ?"
+        " ORDER BY path, track_index",
+        (min_notes, min_pitch, max_pitch),
+    ).fetchall()
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="MIDI library catalogue")
+    sub = arg_parser.add_subparsers(dest="command", required=True)
+
+    index_cmd = sub.add_parser("index", help="(re-)index a directory of MIDI files")
+    index_cmd.add_argument("root")
+    index_cmd.add_argument("--db", default=DEFAULT_DB)
+    index_cmd.add_argument("--workers", type=int, default=None)
+
+    query_cmd = sub.add_parser("query", help="find tracks that fit a pitch range")
+    query_cmd.add_argument("--db", default=DEFAULT_DB)
+    query_cmd.add_argument("--min-pitch", type=int, required=True)
+    query_cmd.add_argument("--max-pitch", type=int, required=True)
+    query_cmd.add_argument("--min-notes", type=int, default=1)
+
+    args = arg_parser.parse_args(argv)
+
+    if args.command == "index":
+        indexed, removed = index_library(args.root, args.db, args.workers)
+        print(f"Indexed {indexed} file(s), removed {removed} missing file(s).")
+    else:
+        conn = open_catalogue(args.db)
+        rows = find_tracks_in_range(conn, args.min_pitch, args.max_pitch, args.min_notes)
+        for path, index, name, count, lo, hi, poly in rows:
+            print(f"{path} track {index} {name!r}: {count} notes, "
+                  f"pitch {lo}-{hi}, polyphony {poly}")
+        conn.close()
+
+if __name__ == "__main__":
+    main()
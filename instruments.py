@@ -0,0 +1,232 @@
+# instruments.py
+#
+# Instrument mappings shared by the Blender animators (blender_anim.py) and
+# the tools that run outside Blender. Kept free of bpy so it can be imported
+# anywhere.
+
+# default track index of each instrument in the MIDI file (track 0 is meta)
+TRACK_IDS = {
+    "drums": 1,
+    "harp": 2,
+    "organ": 3,
+    "bass": 4,
+    "trumpet.001": 5,
+    "trumpet.002": 6,
+}
+
+# map drum pitches to drum objects in Blender
+DRUM_MAPPING = {
+    36: {"hammer": "Kick_Stick", "swing_deg": 14.0, "rebound_deg": 10.0,
+            "drum": "Kick", "hit_dist": 0.01, "rebound_dist": 0.005},
+
+    40: {"hammer": "Snare_Stick", "swing_deg": -12.0, "rebound_deg": -10.0,
+            "drum": "Snare", "hit_dist": 0.01, "rebound_dist": 0.005},
+
+    42: {"hammer": "HiHat_Stick", "swing_deg": -15.0, "rebound_deg": -11.0,
+            "drum": "HiHat", "hit_dist": 0.01, "rebound_dist": 0.005},
+
+    43: {"hammer": "TomLo_Stick", "swing_deg": 18.0, "rebound_deg": 14.0,
+            "drum": "TomLo", "hit_dist": 0.01, "rebound_dist": 0.005},
+
+    45: {"hammer": "TomHi_Stick", "swing_deg": 18.0, "rebound_deg": 10.0,
+            "drum": "TomHi", "hit_dist": 0.01, "rebound_dist": 0.005},
+
+    49: {"hammer": "Crash_Stick", "swing_deg": -17.0, "rebound_deg": -14.0,
+            "drum": "Crash", "hit_dist": 0.01, "rebound_dist": 0.005}
+}
+
+# map harp pitches to harp string objects in Blender (3 octaves from C3 to B5)
+HARP_MAPPING = {
+    60: {"hammer": "Hammer.001", "string": "String.001"}, # C3
+    61: {"hammer": "Hammer.002", "string": "String.002"}, # C#3
+    62: {"hammer": "Hammer.003", "string": "String.003"}, # D3
+    63: {"hammer": "Hammer.004", "string": "String.004"}, # D#3
+    64: {"hammer": "Hammer.005", "string": "String.005"}, # E3
+    65: {"hammer": "Hammer.006", "string": "String.006"}, # F3
+    66: {"hammer": "Hammer.007", "string": "String.007"}, # F#3
+    67: {"hammer": "Hammer.008", "string": "String.008"}, # G3
+    68: {"hammer": "Hammer.009", "string": "String.009"}, # G#3
+    69: {"hammer": "Hammer.010", "string": "String.010"}, # A3
+    70: {"hammer": "Hammer.011", "string": "String.011"}, # A#3
+    71: {"hammer": "Hammer.012", "string": "String.012"}, # B3
+    72: {"hammer": "Hammer.013", "string": "String.013"}, # C4
+    73: {"hammer": "Hammer.014", "string": "String.014"}, # C#4
+    74: {"hammer": "Hammer.015", "string": "String.015"}, # D4
+    75: {"hammer": "Hammer.016", "string": "String.016"}, # D#4
+    76: {"hammer": "Hammer.017", "string": "String.017"}, # E4
+    77: {"hammer": "Hammer.018", "string": "String.018"}, # F4
+    78: {"hammer": "Hammer.019", "string": "String.019"}, # F#4
+    79: {"hammer": "Hammer.020", "string": "String.020"}, # G4
+    80: {"hammer": "Hammer.021", "string": "String.021"}, # G#4
+    81: {"hammer": "Hammer.022", "string": "String.022"}, # A4
+    82: {"hammer": "Hammer.023", "string": "String.023"}, # A#4
+    83: {"hammer": "Hammer.024", "string": "String.024"}, # B4
+    84: {"hammer": "Hammer.025", "string": "String.025"}, # C5
+    85: {"hammer": "Hammer.026", "string": "String.026"}, # C#5
+    86: {"hammer": "Hammer.027", "string": "String.027"}, # D5
+    87: {"hammer": "Hammer.028", "string": "String.028"}, # D#5
+    88: {"hammer": "Hammer.029", "string": "String.029"}, # E5
+    89: {"hammer": "Hammer.030", "string": "String.030"}, # F5
+    90: {"hammer": "Hammer.031", "string": "String.031"}, # F#5
+    91: {"hammer": "Hammer.032", "string": "String.032"}, # G5
+    92: {"hammer": "Hammer.033", "string": "String.033"}, # G#5
+    93: {"hammer": "Hammer.034", "string": "String.034"}, # A5
+    94: {"hammer": "Hammer.035", "string": "String.035"}, # A#5
+    95: {"hammer": "Hammer.036", "string": "String.036"}  # B5
+}
+
+# parameters for harp hammer animation
+HARP_PARAMS = {
+    "swing_deg": -7.0,    # degrees the hammer swings down on hit
+    "rebound_deg": -15.0, # degrees the hammer rebounds after hit
+    "axis": "X",          # rotation axis
+}
+
+# how harp strings vibrate: "keyframes" keys every pluck on the shape keys,
+# "analytic" evaluates a damped oscillator per frame from a hit table
+# (see string_vibration.py, no keyframes on the strings)
+HARP_STRING_MODE = "keyframes"
+
+# damped oscillator of the "analytic" mode, times in frames; a full-velocity
+# hit starts at amp and alternates Key 1 / Key 2 every period / 2 frames
+HARP_STRING_MODEL = {
+    "amp": 0.7,
+    "period": 4.0,
+    "decay": 6.0,
+}
+
+ORGAN_MAPPING = {
+    # map organ pitches to Blender objects
+    57: {"piston": "Piston.001", "glow": "Filament.001"}, # A3
+    58: {"piston": "Piston.002", "glow": "Filament.002"}, # A#3
+    59: {"piston": "Piston.003", "glow": "Filament.003"}, # B3
+    60: {"piston": "Piston.004", "glow": "Filament.004"}, # C4
+    61: {"piston": "Piston.005", "glow": "Filament.005"}, # C#4
+
+    62: {"piston": "Piston.006", "glow": "Filament.006"}, # D4
+    63: {"piston": "Piston.007", "glow": "Filament.007"}, # D#4
+    64: {"piston": "Piston.008", "glow": "Filament.008"}, # E4
+    65: {"piston": "Piston.009", "glow": "Filament.009"}, # F4
+    66: {"piston": "Piston.010", "glow": "Filament.010"}, # F#4
+    67: {"piston": "Piston.011", "glow": "Filament.011"}, # G4
+
+    68: {"piston": "Piston.012", "glow": "Filament.012"}, # G#4
+    69: {"piston": "Piston.013", "glow": "Filament.013"}, # A4
+    70: {"piston": "Piston.014", "glow": "Filament.014"}, # A#4
+    71: {"piston": "Piston.015", "glow": "Filament.015"}, # B4
+    72: {"piston": "Piston.016", "glow": "Filament.016"}, # C5
+    73: {"piston": "Piston.017", "glow": "Filament.017"}, # C#5
+    74: {"piston": "Piston.018", "glow": "Filament.018"}, # D5
+
+    75: {"piston": "Piston.019", "glow": "Filament.019"}, # D#5
+    76: {"piston": "Piston.020", "glow": "Filament.020"}, # E5
+    77: {"piston": "Piston.021", "glow": "Filament.021"}, # F5
+    78: {"piston": "Piston.022", "glow": "Filament.022"}, # F#5
+    79: {"piston": "Piston.023", "glow": "Filament.023"}, # G5
+    80: {"piston": "Piston.024", "glow": "Filament.024"}, # G#5
+
+    81: {"piston": "Piston.025", "glow": "Filament.025"}, # A5
+    82: {"piston": "Piston.026", "glow": "Filament.026"}, # A#5
+    83: {"piston": "Piston.027", "glow": "Filament.027"}, # B5
+    84: {"piston": "Piston.028", "glow": "Filament.028"}, # C6
+    85: {"piston": "Piston.029", "glow": "Filament.029"}, # C#6
+}
+
+# map bass pitches to core objects in Blender
+BASS_MAPPING = {
+    47: "Core.001", # A2
+    48: "Core.002", # A#2
+    49: "Core.003", # B2
+    50: "Core.004", # C3
+    51: "Core.005", # C#3
+    52: "Core.006", # D3
+    53: "Core.007", # D#3
+    54: "Core.008", # E3
+    55: "Core.009", # F3
+    56: "Core.010", # F#3
+    57: "Core.011", # G3
+    58: "Core.012", # G#3
+    59: "Core.013", # A3
+    60: "Core.014", # A#3
+    61: "Core.015", # B3
+    62: "Core.016", # C4
+    63: "Core.017", # C#4
+    64: "Core.018", # D4
+    65: "Core.019", # D#4
+    66: "Core.020", # E4
+    67: "Core.021", # F4
+    68: "Core.022", # F#4
+    69: "Core.023", # G4
+    70: "Core.024"  # G#4
+}
+
+# trumpet pitch range mapped onto the gyro rotation limits
+TRUMPET_PITCH_RANGE = (38, 57)
+
+# which pitches each animator reacts to (None = every pitch)
+MAPPED_PITCHES = {
+    "drums": set(DRUM_MAPPING),
+    "harp": set(HARP_MAPPING),
+    "organ": set(ORGAN_MAPPING),
+    "bass": set(BASS_MAPPING),
+    "trumpet": None,
+}
+
+# scene objects animated by each instrument (cleared before re-animating)
+DRUM_OBJECTS = [
+    "Kick_Stick", "Kick",
+    "Snare_Stick", "Snare",
+    "HiHat_Stick", "HiHat",
+    "TomLo_Stick", "TomLo",
+    "TomHi_Stick", "TomHi",
+    "Crash_Stick", "Crash"
+]
+HARP_HAMMERS = [
+    "Hammer.001", "Hammer.002", "Hammer.003", "Hammer.004", 
+    "Hammer.005", "Hammer.006", "Hammer.007", "Hammer.008", 
+    "Hammer.009", "Hammer.010", "Hammer.011", "Hammer.012", 
+    "Hammer.013", "Hammer.014", "Hammer.015", "Hammer.016", 
+    "Hammer.017", "Hammer.018", "Hammer.019", "Hammer.020", 
+    "Hammer.021", "Hammer.022", "Hammer.023", "Hammer.024", 
+    "Hammer.025", "Hammer.026", "Hammer.027", "Hammer.028", 
+    "Hammer.029", "Hammer.030", "Hammer.031", "Hammer.032", 
+    "Hammer.033", "Hammer.034", "Hammer.035", "Hammer.036",
+]
+HARP_STRINGS = [
+    "String.001", "String.002", "String.003", "String.004", 
+    "String.005", "String.006", "String.007", "String.008", 
+    "String.009", "String.010", "String.011", "String.012", 
+    "String.013", "String.014", "String.015", "String.016", 
+    "String.017", "String.018", "String.019", "String.020", 
+    "String.021", "String.022", "String.023", "String.024", 
+    "String.025", "String.026", "String.027", "String.028", 
+    "String.029", "String.030", "String.031", "String.032", 
+    "String.033", "String.034", "String.035", "String.036"
+]
+ORGAN_PISTONS = [
+    "Piston.001", "Piston.002", "Piston.003", "Piston.004", "Piston.005",
+    "Piston.006", "Piston.007", "Piston.008", "Piston.009", "Piston.010",
+    "Piston.011", "Piston.012", "Piston.013", "Piston.014", "Piston.015",
+    "Piston.016", "Piston.017", "Piston.018", "Piston.019", "Piston.020",
+    "Piston.021", "Piston.022", "Piston.023", "Piston.024", "Piston.025",
+    "Piston.026", "Piston.027", "Piston.028", "Piston.029",
+]
+ORGAN_FILAMENTS = [
+    "Filament.001", "Filament.002", "Filament.003", "Filament.004", "Filament.005",
+    "Filament.006", "Filament.007", "Filament.008", "Filament.009", "Filament.010",
+    "Filament.011", "Filament.012", "Filament.013", "Filament.014", "Filament.015",
+    "Filament.016", "Filament.017", "Filament.018", "Filament.019", "Filament.020",
+    "Filament.021", "Filament.022", "Filament.023", "Filament.024", "Filament.025",
+    "Filament.026", "Filament.027", "Filament.028", "Filament.029"
+]
+BASS_OBJECTS = [
+    "Core.001", "Core.002", "Core.003", "Core.004", "Core.005",
+    "Core.006", "Core.007", "Core.008", "Core.009", "Core.010",
+    "Core.011", "Core.012", "Core.013", "Core.014", "Core.015",
+    "Core.016", "Core.017", "Core.018", "Core.019", "Core.020",
+    "Core.021", "Core.022", "Core.023", "Core.024"
+]
+TRUMPET_OBJECTS = [
+    "Gyro_X.001", "Gyro_Z.001", "Beam.001",
+    "Gyro_X.002", "Gyro_Z.002", "Beam.002",
+]
@@ -1,4 +1,6 @@
 # import mido
+import heapq
+
 import mido
 from notes import Note
 
@@ -14,12 +16,53 @@ def get_tempo(mid):
                 return msg.tempo  # Tempo in microseconds per beat
     return 500000  # Default tempo (120 bpm) if no tempo message is found
 
+def get_tempo_map(mid):
+    """Return [(abs_tick, tempo), ...] for every set_tempo message, in tick order"""
+    tempo_map = []
+    for track in mid.tracks:
+        now = 0
+        for msg in track:
+            now += msg.time
+            if msg.type == 'set_tempo':
+                tempo_map.append((now, msg.tempo))
+    tempo_map.sort()
+    return tempo_map
+
+def get_time_signatures(mid):
+    """
+    Return [(abs_tick, numerator, denominator, clocks_per_click,
+    notated_32nd_notes_per_beat), ...] for every time_signature message, in tick order
+    """
+    signatures = []
+    for track in mid.tracks:
+        now = 0
+        for msg in track:
+            now += msg.time
+            if msg.type == 'time_signature':
+                signatures.append((now, msg.numerator, msg.denominator,
+                                   msg.clocks_per_click, msg.notated_32nd_notes_per_beat))
+    signatures.sort()
+    return signatures
+
 def ticks_to_frames(ticks, ticks_per_beat, tempo, fps=24):
     """Convert ticks to frames based on tempo and sample rate"""
     seconds = mido.tick2second(ticks, ticks_per_beat, tempo)
     frames = int(round(seconds * fps))
     return frames
 
+def make_note(start_time, end_time, pitch, velocity, ticks_per_beat, tempo):
+    """Create a Note from its start/end ticks"""
+    return Note(
+        start_tick=start_time,
+        end_tick=end_time,
+        pitch=pitch,
+        velocity=velocity,
+        start_sec=mido.tick2second(start_time, ticks_per_beat, tempo), # convert ticks to seconds
+        end_sec=mido.tick2second(end_time, ticks_per_beat, tempo),
+        start_frame=ticks_to_frames(start_time, ticks_per_beat, tempo), # convert ticks to frames
+        end_frame=ticks_to_frames(end_time, ticks_per_beat, tempo)
+    )
+
 # found reference on Carnegie Mellon (http://course.ece.cmu.edu/~ece500/projects/f24-teamc5/wp-content/uploads/sites/332/2024/11/current-python-midi-parsing-code.pdf)
 def parse_track(track, ticks_per_beat, tempo):
     """Parse a MIDI track and extract note events"""
@@ -40,21 +83,70 @@ def parse_track(track, ticks_per_beat, tempo):
                 start_time, velocity = note_on_events[msg.note]
                 end_time = current_time
                 # create Note object
-                note_obj = Note(
-                    start_tick=start_time,
-                    end_tick=end_time,
-                    pitch=msg.note,
-                    velocity=velocity,
-                    start_sec=mido.tick2second(start_time, ticks_per_beat, tempo), # convert ticks to seconds
-                    end_sec=mido.tick2second(end_time, ticks_per_beat, tempo),
-                    start_frame=ticks_to_frames(start_time, ticks_per_beat, tempo), # convert ticks to frames
-                    end_frame=ticks_to_frames(end_time, ticks_per_beat, tempo)
-                )
+                note_obj = make_note(start_time, end_time, msg.note, velocity,
+                                     ticks_per_beat, tempo)
                 notes.append(note_obj)
                 del note_on_events[msg.note]
 
     return notes
 
+# longest note iter_track_notes waits for: a note still open after this many
+# beats (a drone, or a note_on without note_off) ends there
+MAX_NOTE_BEATS = 64
+
+def iter_track_notes(messages, ticks_per_beat, tempo, max_note_beats=MAX_NOTE_BEATS,
+                     warn=True):
+    """
+    Streaming parse_track: yield the notes of a message stream in start order
+
+    Pairs note on/off like parse_track, but a finished note is held back only
+    until every note that started before it has ended, so memory is bounded by
+    polyphony (and max_note_beats) instead of the track length. Notes with
+    the same start come out in the order parse_track lists them.
+
+    Notes are capped at max_note_beats: a note still open after that is
+    ended at the limit (its note_off is then ignored), so it can't hold back
+    the rest of the track. Such notes are kept, shorter than in parse_track.
+    warn=False skips the warning printed for each capped note.
+    """
+    max_note_ticks = max_note_beats * ticks_per_beat
+    current_time = 0
+    note_on_events = {}
+    finished = [] # heap of (start tick, end order, note)
+    order = 0
+
+    def finish(pitch, start_time, end_time, velocity):
+        nonlocal order
+        if end_time - start_time > max_note_ticks:
+            if warn:
+                print(f"[WARN] note {pitch} at tick {start_time} held longer than "
+                      f"{max_note_beats} beats, ending it there.")
+            end_time = start_time + max_note_ticks
+        note_obj = make_note(start_time, end_time, pitch, velocity, ticks_per_beat, tempo)
+        heapq.heappush(finished, (start_time, order, note_obj))
+        order += 1
+
+    for msg in messages:
+        current_time += msg.time
+        if msg.type == 'note_on' and msg.velocity > 0:
+            note_on_events[msg.note] = (current_time, msg.velocity)
+        elif (msg.type == 'note_off') or (msg.type == 'note_on' and msg.velocity == 0):
+            if msg.note in note_on_events:
+                start_time, velocity = note_on_events.pop(msg.note)
+                finish(msg.note, start_time, current_time, velocity)
+
+                # end notes open past the limit, then release notes no open note started before
+                for pitch, (t, v) in list(note_on_events.items()):
+                    if current_time - t > max_note_ticks:
+                        del note_on_events[pitch]
+                        finish(pitch, t, current_time, v)
+                oldest_open = min((t for t, _ in note_on_events.values()), default=None)
+                while finished and (oldest_open is None or finished[0][0] <= oldest_open):
+                    yield heapq.heappop(finished)[2]
+
+    while finished:
+        yield heapq.heappop(finished)[2]
+
 def parse_midi_file(mid):
     """Parse the entire MIDI file and extract notes from all tracks"""
     ticks_per_beat = mid.ticks_per_beat 
@@ -0,0 +1,159 @@
+# patterns.py
+#
+# Finds repeated bar patterns in a track so looping parts (drums, bass) can be
+# keyframed once per unique pattern and placed as NLA strips, instead of
+# keyframing every hit. No bpy needed, so patterns and strip layouts can be
+# inspected outside Blender:
+#
+#   python patterns.py solarpunkFIN.mid
+#
+# A window's pattern is the note frames relative to the window start, taken
+# from every note whose keyframes can reach the window (including a guard band
+# for interpolation). Two windows with the same pattern therefore produce the
+# same F-Curve inside the window, and the action baked for one can be reused.
+
+import argparse
+import sys
+from bisect import bisect_left
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+VENDOR_DIR = PROJECT_ROOT / "vendor"
+
+for p in (PROJECT_ROOT, VENDOR_DIR):
+    sp = str(p)
+    if sp not in sys.path:
+        sys.path.insert(0, sp)
+
+import mido
+from instruments import BASS_MAPPING, DRUM_MAPPING, TRACK_IDS
+from parser import get_tempo, get_time_signatures, parse_midi_file, ticks_to_frames
+
+# keyframe reach of the animators around a note, mirroring blender_anim.py:
+# (frames before note start, frames after the anchor, anchor is note end)
+REACH = {
+    "drum_hammer": (16, 10, False),
+    "drum_body": (0, 6, False),
+    "glow": (6, 6, True),
+}
+
+### BAR WINDOWS ###
+def bar_ticks(mid, end_tick):
+    """Bar line ticks covering [0, end_tick], following the time signature changes"""
+    signatures = [sig[:3] for sig in get_time_signatures(mid)]
+    if not signatures or signatures[0][0] > 0:
+        signatures.insert(0, (0, 4, 4))
+
+    # a signature change takes effect at the next bar line; one extra bar
+    # after end_tick leaves room for keyframes that settle after the last note
+    bars = []
+    tick = i = 0
+    while not bars or bars[-1] <= end_tick:
+        while i + 1 < len(signatures) and signatures[i + 1][0] <= tick:
+            i += 1
+        _, numerator, denominator = signatures[i]
+        bars.append(tick)
+        tick += numerator * mid.ticks_per_beat * 4 // denominator
+    bars.append(tick)
+    return bars
+
+def bar_windows(mid, track_list, bars_per_window=1, fps=24):
+    """
+    Split the song into [(start_frame, end_frame), ...] windows of whole bars
+
+    Frames are converted the same way parser.py converts note times.
+    """
+    end_tick = max((n.end_tick for notes in track_list for n in notes), default=0)
+    tempo = get_tempo(mid)
+    bars = bar_ticks(mid, end_tick)[::bars_per_window]
+    frames = [ticks_to_frames(t, mid.ticks_per_beat, tempo, fps) for t in bars]
+    return list(zip(frames[:-1], frames[1:]))
+
+### PATTERNS ###
+def find_patterns(notes, windows, reach):
+    """
+    Group windows by the pattern of notes that animate them
+
+    reach is (frames before, frames after, anchor on end) of the animator.
+    Returns (patterns, placements): patterns is a list of unique
+    (window length, ((start, end), ...)) with frames relative to the window
+    start, placements is [(start_frame, end_frame, pattern index), ...] for
+    every window the notes animate.
+    """
+    before, after, uses_end = reach
+    guard = before + after
+    notes = sorted(notes, key=lambda n: n.start_frame)
+    starts = [n.start_frame for n in notes]
+    longest = max((n.end_frame - n.start_frame for n in notes), default=0) if uses_end else 0
+
+    patterns = []
+    index = {}
+    placements = []
+    for start, end in windows:
+        lo = bisect_left(starts, start - guard - after - longest)
+        hi = bisect_left(starts, end + guard + before)
+
+        rel = []
+        visible = False
+        for n in notes[lo:hi]:
+            first = n.start_frame - before
+            last = (n.end_frame if uses_end else n.start_frame) + after
+            if last < start - guard:
+                continue
+            rel.append((n.start_frame - start, n.end_frame - start))
+            visible = visible or (first < end and last > start)
+
+        if not visible:
+            continue  # the object rests for the whole window
+
+        pattern = (end - start, tuple(rel))
+        if pattern not in index:
+            index[pattern] = len(patterns)
+            patterns.append(pattern)
+        placements.append((start, end, index[pattern]))
+    return patterns, placements
+
+def instrument_patterns(track_list, windows, track_ids=TRACK_IDS):
+    """
+    Patterns per animated object of the looping instruments
+
+    Returns {object name: (reach key, patterns, placements)}.
+    """
+    by_pitch = {}
+    for name in ("drums", "bass"):
+        for note in track_list[track_ids[name]] if track_ids[name] < len(track_list) else []:
+            by_pitch.setdefault((name, note.pitch), []).append(note)
+
+    result = {}
+    for pitch, cfg in DRUM_MAPPING.items():
+        notes = by_pitch.get(("drums", pitch))
+        if notes:
+            for obj_key, reach in (("hammer", "drum_hammer"), ("drum", "drum_body")):
+                result[cfg[obj_key]] = (reach,) + find_patterns(notes, windows, REACH[reach])
+    for pitch, obj_name in BASS_MAPPING.items():
+        notes = by_pitch.get(("bass", pitch))
+        if notes:
+            result[obj_name] = ("glow",) + find_patterns(notes, windows, REACH["glow"])
+    return result
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="repeated bar patterns per object")
+    arg_parser.add_argument("midi_path")
+    arg_parser.add_argument("--bars", type=int, default=1, help="bars per window")
+    args = arg_parser.parse_args(argv)
+
+    mid = mido.MidiFile(args.midi_path)
+    track_list = parse_midi_file(mid)
+    windows = bar_windows(mid, track_list, args.bars)
+
+    total_windows = total_patterns = 0
+    for obj_name, (_, patterns, placements) in instrument_patterns(track_list, windows).items():
+        total_windows += len(placements)
+        total_patterns += len(patterns)
+        print(f"{obj_name:<16} {len(patterns):>4} pattern(s) in {len(placements):>4} window(s)")
+    if total_patterns:
+        print(f"reuse factor {total_windows / total_patterns:.1f}x "
+              f"({total_windows} strips from {total_patterns} actions)")
+
+if __name__ == "__main__":
+    main()
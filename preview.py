@@ -0,0 +1,518 @@
+# preview.py
+#
+# Headless timing preview: draws a schematic 2D view of the animated objects
+# (drum sticks and drums, harp hammers and strings, organ pistons and
+# filaments, bass cores, trumpet lasers) for every frame, straight from the
+# parsed track_list and the instrument mappings, without Blender.
+#
+# Motion follows the keyframes blender_anim.py would insert (same frames and
+# values, linear instead of Bezier interpolation), so hits line up exactly
+# with what a render would show. Frames are rasterized with numpy in chunks
+# on a pool of worker processes. Runs outside Blender (needs numpy):
+#
+#   python preview.py solarpunkFIN.mid --out preview/              # PNG sequence
+#   python preview.py solarpunkFIN.mid --video preview.mp4 --audio solarpunkFIN.mp3
+#   python preview.py solarpunkFIN.mid --raw - | ffplay -f rawvideo -pixel_format rgb24 -video_size 640x360 -framerate 24 -
+#
+# --video needs ffmpeg on PATH.
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from math import pi
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+VENDOR_DIR = PROJECT_ROOT / "vendor"
+
+for p in (PROJECT_ROOT, VENDOR_DIR):
+    sp = str(p)
+    if sp not in sys.path:
+        sys.path.insert(0, sp)
+
+import mido
+from instruments import (
+    BASS_MAPPING,
+    DRUM_MAPPING,
+    HARP_MAPPING,
+    HARP_PARAMS,
+    HARP_STRING_MODE,
+    HARP_STRING_MODEL,
+    ORGAN_MAPPING,
+    TRACK_IDS,
+    TRUMPET_PITCH_RANGE,
+)
+from parser import parse_midi_file
+from string_vibration import displacement, hit_table
+
+FPS = 24
+SIZE = (640, 360)
+CHUNK_FRAMES = 48
+TAIL_FRAMES = 24  # frames rendered after the last note end (settle keys)
+
+BACKGROUND = (18, 20, 26)
+WOOD = (214, 170, 110)
+METAL = (150, 156, 170)
+STRING = (200, 200, 210)
+GLOW_OFF = (50, 40, 30)
+GLOW_ON = (255, 190, 80)
+BASS_ON = (90, 200, 255)
+LASER = (255, 60, 60)
+
+### MOTION CURVES ###
+class Keys:
+    """
+    Keyframes of one animated property, like an F-Curve: inserting on a frame
+    that already has a key replaces its value
+    """
+    def __init__(self):
+        self.points = {}
+
+    def insert(self, frame, value):
+        self.points[frame] = value
+
+    def evaluate(self, frames, constant=False):
+        """Values at frames, held constant before the first and after the last key"""
+        if not self.points:
+            return np.zeros(len(frames), dtype=np.float32)
+        key_frames = sorted(self.points)
+        key_values = np.array([self.points[f] for f in key_frames], dtype=np.float64)
+        if constant:
+            i = np.maximum(np.searchsorted(key_frames, frames, side="right") - 1, 0)
+            return key_values[i].astype(np.float32)
+        return np.interp(frames, key_frames, key_values).astype(np.float32)
+
+# the curve builders mirror the keyframes of the animators in blender_anim.py;
+# angles are degrees relative to the rest pose, offsets are normalized
+def hammer_keys(notes, swing_deg, rebound_deg, timing, rebound_extra=0.0):
+    """animate_drum_hammer (timing (16, 4, 6, 10)) / animate_hammer_harp ((24, 4, 8, 16))"""
+    hold, pre, rebound, settle = timing
+    keys = Keys()
+    for note in sorted(notes, key=lambda n: n.start_frame):
+        hit = note.start_frame
+        keys.insert(hit - hold, 0.0)
+        keys.insert(hit - pre, rebound_deg)
+        keys.insert(hit, -swing_deg)
+        keys.insert(hit + rebound, rebound_deg + rebound_extra)
+        keys.insert(hit + settle, 0.0)
+    return keys
+
+def drum_body_keys(notes, hit_dist, rebound_dist):
+    """animate_drum_body, in units of hit_dist (-1 = fully down)"""
+    keys = Keys()
+    for note in sorted(notes, key=lambda n: n.start_frame):
+        hit = note.start_frame
+        keys.insert(hit, 0.0)
+        keys.insert(hit + 2, -1.0)
+        keys.insert(hit + 4, rebound_dist / hit_dist)
+        keys.insert(hit + 6, 0.0)
+    return keys
+
+def string_keys(notes, amp=0.7, cycles=4, step=2):
+    """animate_string_vibrate_2keys as one signed curve ("Key 1" - "Key 2")"""
+    keys = Keys()
+    total_ticks = cycles * 2
+    for note in sorted(notes, key=lambda n: n.start_frame):
+        hit = int(note.start_frame)
+        keys.insert(hit - 1, 0.0)
+        for i in range(total_ticks):
+            a = amp * (1.0 - i / max(1, total_ticks))
+            keys.insert(hit + i * step, a if i % 2 == 0 else -a)
+        keys.insert(hit + total_ticks * step + step, 0.0)
+    return keys
+
+def hold_keys(notes, lead=6, tail=6):
+    """animate_piston / animate_glow: 0 -> 1 over lead frames, held, back over tail frames"""
+    keys = Keys()
+    for note in sorted(notes, key=lambda n: n.start_frame):
+        keys.insert(note.start_frame - lead, 0.0)
+        keys.insert(note.start_frame, 1.0)
+        keys.insert(note.end_frame, 1.0)
+        keys.insert(note.end_frame + tail, 0.0)
+    return keys
+
+def trumpet_keys(notes, threshold=7):
+    """animate_trumpet_laser: (Gyro_X degrees, Gyro_Z degrees, beam visible) keys"""
+    gx, gz, beam = Keys(), Keys(), Keys()
+    notes = sorted(notes, key=lambda n: n.start_frame)
+    pmin, pmax = TRUMPET_PITCH_RANGE
+    beam.insert(1, 0.0)
+    for i, note in enumerate(notes):
+        prev_end = notes[i - 1].end_frame if i > 0 else None
+        next_start = notes[i + 1].start_frame if i + 1 < len(notes) else None
+        on, off = note.start_frame, note.end_frame
+
+        beam.insert(on, 0.0)
+        beam.insert(on + 1, 1.0)
+        beam.insert(off - 1, 1.0)
+        beam.insert(off, 0.0)
+
+        t = 0.5 if pmax == pmin else min(max((note.pitch - pmin) / (pmax - pmin), 0.0), 1.0)
+        x_deg = -30.0 + t * 60.0
+        z_deg = -50.0 + t * 100.0
+
+        if prev_end is None or on - prev_end > threshold:
+            gx.insert(on - 3, 0.0)
+            gz.insert(on - 3, 0.0)
+        # blender_anim keys Gyro_X twice at the note end and Gyro_Z only at the start
+        gx.insert(on, x_deg)
+        gx.insert(off, x_deg)
+        gz.insert(on, z_deg)
+        if next_start is None or next_start - off > threshold:
+            gx.insert(off + 3, 0.0)
+            gz.insert(off + 3, 0.0)
+    return gx, gz, beam
+
+def analytic_string_curve(notes, frames):
+    """HARP_STRING_MODE = "analytic": the damped oscillator of string_vibration.py"""
+    hit_frames, amps = hit_table(notes, HARP_STRING_MODEL["amp"])
+    period, decay = HARP_STRING_MODEL["period"], HARP_STRING_MODEL["decay"]
+    return np.array([displacement(f, hit_frames, amps, period, decay) for f in frames],
+                    dtype=np.float32)
+
+def scene_curves(track_list, frames, track_ids=TRACK_IDS):
+    """
+    Per-frame motion of every animated object over frames
+
+    Returns {Blender object name: float32 array}; objects without notes are
+    left out and drawn at rest.
+    """
+    def by_pitch(name):
+        track_id = track_ids[name]
+        if track_id >= len(track_list):
+            print(f"[WARN] no track {track_id} for {name}, drawing it at rest.")
+            return {}
+        notes_by_pitch = {}
+        for note in track_list[track_id]:
+            notes_by_pitch.setdefault(note.pitch, []).append(note)
+        return notes_by_pitch
+
+    curves = {}
+    drum_notes = by_pitch("drums")
+    for pitch, cfg in DRUM_MAPPING.items():
+        if pitch in drum_notes:
+            notes = drum_notes[pitch]
+            curves[cfg["hammer"]] = hammer_keys(notes, cfg["swing_deg"], cfg["rebound_deg"],
+                                                (16, 4, 6, 10)).evaluate(frames)
+            curves[cfg["drum"]] = drum_body_keys(notes, cfg["hit_dist"],
+                                                 cfg["rebound_dist"]).evaluate(frames)
+
+    harp_notes = by_pitch("harp")
+    for pitch, cfg in HARP_MAPPING.items():
+        if pitch in harp_notes:
+            notes = harp_notes[pitch]
+            curves[cfg["hammer"]] = hammer_keys(notes, HARP_PARAMS["swing_deg"],
+                                                HARP_PARAMS["rebound_deg"], (24, 4, 8, 16),
+                                                rebound_extra=5.0).evaluate(frames)
+            if HARP_STRING_MODE == "analytic":
+                curves[cfg["string"]] = analytic_string_curve(notes, frames)
+            else:
+                curves[cfg["string"]] = string_keys(notes).evaluate(frames)
+
+    organ_notes = by_pitch("organ")
+    for pitch, cfg in ORGAN_MAPPING.items():
+        if pitch in organ_notes:
+            lift = hold_keys(organ_notes[pitch]).evaluate(frames)
+            curves[cfg["piston"]] = lift
+            curves[cfg["glow"]] = lift
+
+    bass_notes = by_pitch("bass")
+    for pitch, obj_name in BASS_MAPPING.items():
+        if pitch in bass_notes:
+            curves[obj_name] = hold_keys(bass_notes[pitch]).evaluate(frames)
+
+    for name in track_ids:
+        if name.startswith("trumpet") and track_ids[name] < len(track_list):
+            obj_num = name[len("trumpet"):]
+            gx, gz, beam = trumpet_keys(track_list[track_ids[name]])
+            curves["Gyro_X" + obj_num] = gx.evaluate(frames)
+            curves["Gyro_Z" + obj_num] = gz.evaluate(frames)
+            curves["Beam" + obj_num] = beam.evaluate(frames, constant=True)
+    return curves
+
+### RASTERIZATION ###
+# every primitive is drawn for all frames of a chunk at once: per-frame
+# parameters have shape (frames, 1, 1) and broadcast against the pixel
+# coordinates of the primitive's bounding tile
+def _per_frame(value, num_frames):
+    return np.broadcast_to(np.asarray(value, dtype=np.float32), (num_frames,))[:, None, None]
+
+def _blend(canvas, bounds, coverage_fn, color):
+    """Blend color into canvas where coverage_fn(px, py) (frames, h, w) is > 0"""
+    height, width = canvas.shape[1:3]
+    x0, x1, y0, y1 = bounds
+    x0, y0 = max(int(x0), 0), max(int(y0), 0)
+    x1, y1 = min(int(x1) + 2, width), min(int(y1) + 2, height)
+    if x0 >= x1 or y0 >= y1:
+        return
+    px = np.arange(x0, x1, dtype=np.float32)[None, None, :] + 0.5
+    py = np.arange(y0, y1, dtype=np.float32)[None, :, None] + 0.5
+    coverage = coverage_fn(px, py)[..., None]
+
+    color = np.asarray(color, dtype=np.float32)
+    if color.ndim == 2:
+        color = color[:, None, None, :]  # one color per frame
+    region = canvas[:, y0:y1, x0:x1].astype(np.float32)
+    canvas[:, y0:y1, x0:x1] = region + (color - region) * coverage + 0.5
+
+def draw_segment(canvas, x0, y0, x1, y1, width, color, alpha=1.0):
+    """Antialiased line segment with per-frame end points"""
+    n = canvas.shape[0]
+    x0, y0, x1, y1, alpha = (_per_frame(v, n) for v in (x0, y0, x1, y1, alpha))
+    pad = width / 2 + 1
+    bounds = (min(x0.min(), x1.min()) - pad, max(x0.max(), x1.max()) + pad,
+              min(y0.min(), y1.min()) - pad, max(y0.max(), y1.max()) + pad)
+    dx, dy = x1 - x0, y1 - y0
+    length2 = np.maximum(dx * dx + dy * dy, 1e-6)
+
+    def coverage(px, py):
+        t = np.clip(((px - x0) * dx + (py - y0) * dy) / length2, 0.0, 1.0)
+        dist = np.hypot(px - x0 - t * dx, py - y0 - t * dy)
+        return np.clip(width / 2 + 0.5 - dist, 0.0, 1.0) * alpha
+    _blend(canvas, bounds, coverage, color)
+
+def draw_rect(canvas, cx, cy, w, h, color):
+    """Axis-aligned rectangle with a per-frame center"""
+    n = canvas.shape[0]
+    cx, cy = _per_frame(cx, n), _per_frame(cy, n)
+    bounds = (cx.min() - w / 2 - 1, cx.max() + w / 2 + 1,
+              cy.min() - h / 2 - 1, cy.max() + h / 2 + 1)
+
+    def coverage(px, py):
+        return (np.clip(w / 2 + 0.5 - np.abs(px - cx), 0.0, 1.0)
+                * np.clip(h / 2 + 0.5 - np.abs(py - cy), 0.0, 1.0))
+    _blend(canvas, bounds, coverage, color)
+
+def draw_disc(canvas, cx, cy, r, color):
+    """Filled circle, color may be per frame"""
+    bounds = (cx - r - 1, cx + r + 1, cy - r - 1, cy + r + 1)
+
+    def coverage(px, py):
+        return np.clip(r + 0.5 - np.hypot(px - cx, py - cy), 0.0, 1.0)
+    _blend(canvas, bounds, coverage, color)
+
+def draw_string(canvas, x, y0, y1, offset, width, color):
+    """Vertical string from y0 to y1 bowed sideways by offset pixels at its middle"""
+    offset = _per_frame(offset, canvas.shape[0])
+    reach = float(np.abs(offset).max()) + width / 2 + 1
+    bounds = (x - reach, x + reach, y0, y1)
+
+    def coverage(px, py):
+        center = x + offset * np.sin(pi * np.clip((py - y0) / (y1 - y0), 0.0, 1.0))
+        inside = (py >= y0) & (py <= y1)
+        return np.clip(width / 2 + 0.5 - np.abs(px - center), 0.0, 1.0) * inside
+    _blend(canvas, bounds, coverage, color)
+
+def glow_color(level, off=GLOW_OFF, on=GLOW_ON):
+    """(frames, 3) color between off and on for glow levels in [0, 1]"""
+    level = np.clip(np.asarray(level, dtype=np.float32), 0.0, 1.0)[:, None]
+    return np.asarray(off, np.float32) + (np.asarray(on, np.float32) - np.asarray(off, np.float32)) * level
+
+def stick(canvas, pivot, hit_tip, lift_deg, width, color):
+    """Stick swinging around pivot, touching hit_tip at zero lift (angles exaggerated 2x)"""
+    theta = np.radians(2.0 * lift_deg)
+    vx, vy = hit_tip[0] - pivot[0], hit_tip[1] - pivot[1]
+    c, s = np.cos(theta), np.sin(theta)
+    draw_segment(canvas, pivot[0], pivot[1],
+                 pivot[0] + c * vx - s * vy, pivot[1] + s * vx + c * vy, width, color)
+
+def lift(angle, swing_deg):
+    """Hammer angle -> degrees away from its hit pose (0 = hit, > 0 = raised)"""
+    return (angle + swing_deg) * np.sign(swing_deg)
+
+def draw_scene(canvas, curves):
+    """Draw every object for the frames of canvas (curves sliced to the same frames)"""
+    n, height, width = canvas.shape[:3]
+    rest = np.zeros(n, dtype=np.float32)
+
+    def curve(name):
+        return curves.get(name, rest)
+
+    # drums: top left
+    step = 0.38 * width / len(DRUM_MAPPING)
+    for i, cfg in enumerate(DRUM_MAPPING.values()):
+        cx, cy = 0.03 * width + (i + 0.5) * step, 0.32 * height
+        draw_rect(canvas, cx, cy - 0.02 * height * curve(cfg["drum"]),
+                  0.7 * step, 0.07 * height, METAL)
+        stick(canvas, (cx + 0.35 * step, cy - 0.22 * height), (cx, cy - 0.05 * height),
+              lift(curve(cfg["hammer"]), cfg["swing_deg"]), 2.5, WOOD)
+
+    # harp: top right
+    step = 0.52 * width / len(HARP_MAPPING)
+    y0, y1 = 0.06 * height, 0.40 * height
+    for i, cfg in enumerate(HARP_MAPPING.values()):
+        x = 0.45 * width + (i + 0.5) * step
+        draw_string(canvas, x, y0, y1, 0.6 * step * curve(cfg["string"]), 1.0, STRING)
+        stick(canvas, (x, y1 + 0.10 * height), (x, y1 - 0.02 * height),
+              lift(curve(cfg["hammer"]), HARP_PARAMS["swing_deg"]), 1.5, WOOD)
+
+    # organ: bottom left, filaments above the pistons
+    step = 0.47 * width / len(ORGAN_MAPPING)
+    for i, cfg in enumerate(ORGAN_MAPPING.values()):
+        x = 0.03 * width + (i + 0.5) * step
+        draw_rect(canvas, x, 0.62 * height, 0.6 * step, 0.04 * height,
+                  glow_color(curve(cfg["glow"])))
+        draw_rect(canvas, x, (0.86 - 0.08 * curve(cfg["piston"])) * height,
+                  0.7 * step, 0.14 * height, METAL)
+
+    # bass: bottom middle, 6 x 4 grid of cores
+    cell = 0.27 * width / 6
+    for i, obj_name in enumerate(BASS_MAPPING.values()):
+        row, col = divmod(i, 6)
+        draw_disc(canvas, 0.53 * width + (col + 0.5) * cell, 0.60 * height + (row + 0.5) * cell,
+                  0.35 * cell, glow_color(curve(obj_name), on=BASS_ON))
+
+    # trumpets: bottom right, Gyro_Z turns the beam, Gyro_X changes its reach
+    for i, obj_num in enumerate((".001", ".002")):
+        bx, by = (0.86 + 0.08 * i) * width, 0.94 * height
+        azimuth = np.radians(curve("Gyro_Z" + obj_num)) * 0.5
+        reach = 0.55 * height * (1.0 + curve("Gyro_X" + obj_num) / 60.0)
+        dx, dy = np.sin(azimuth), -np.cos(azimuth)
+        draw_segment(canvas, bx, by, bx + dx * reach, by + dy * reach, 2.0, LASER,
+                     alpha=curve("Beam" + obj_num))
+        draw_segment(canvas, bx, by, bx + dx * 0.05 * height, by + dy * 0.05 * height,
+                     5.0, METAL)
+
+### OUTPUT ###
+def png_bytes(image):
+    """Encode an (h, w, 3) uint8 image as PNG (no filtering, fast zlib level)"""
+    height, width = image.shape[:2]
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 1:] = image.reshape(height, -1)
+
+    def chunk(tag, data):
+        return (len(data).to_bytes(4, "big") + tag + data
+                + zlib.crc32(tag + data).to_bytes(4, "big"))
+
+    header = width.to_bytes(4, "big") + height.to_bytes(4, "big") + bytes([8, 2, 0, 0, 0])
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(rows.tobytes(), 1)) + chunk(b"IEND", b""))
+
+def render_chunk(job):
+    """
+    Rasterize one chunk of frames in a worker process
+
+    With job["out_dir"] the frames are written as PNGs and the frame count is
+    returned, otherwise the raw rgb24 bytes of the chunk.
+    """
+    width, height = job["size"]
+    canvas = np.empty((len(job["frames"]), height, width, 3), dtype=np.uint8)
+    row = np.empty((width, 3), dtype=np.uint8)
+    row[:] = BACKGROUND
+    canvas[:] = row  # much faster than broadcasting the 3-tuple itself
+    draw_scene(canvas, job["curves"])
+
+    if job["out_dir"] is None:
+        return canvas.tobytes()
+    for frame, image in zip(job["frames"], canvas):
+        with open(Path(job["out_dir"]) / f"frame_{frame:05d}.png", "wb") as f:
+            f.write(png_bytes(image))
+    return len(canvas)
+
+def chunk_jobs(curves, frames, size, chunk_frames=CHUNK_FRAMES, out_dir=None):
+    """Split the song into render_chunk jobs, each with its slice of the curves"""
+    for i in range(0, len(frames), chunk_frames):
+        yield {
+            "frames": frames[i:i + chunk_frames].tolist(),
+            "curves": {name: c[i:i + chunk_frames] for name, c in curves.items()},
+            "size": size,
+            "out_dir": out_dir,
+        }
+
+def ordered_results(pool, fn, jobs, max_pending):
+    """pool.map that keeps at most max_pending jobs in flight (results are large)"""
+    pending = deque()
+    for job in jobs:
+        pending.append(pool.submit(fn, job))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def render_preview(track_list, frame_start=1, frame_end=None, size=SIZE, out_dir=None,
+                   sink=None, chunk_frames=CHUNK_FRAMES, workers=None):
+    """
+    Render the preview of frames [frame_start, frame_end] on worker processes
+
+    Frames go to out_dir as a PNG sequence, or in order as raw rgb24 to
+    sink.write. Returns the number of frames rendered.
+    """
+    if frame_end is None:
+        frame_end = max((n.end_frame for notes in track_list for n in notes),
+                        default=frame_start) + TAIL_FRAMES
+    frames = np.arange(frame_start, frame_end + 1)
+    curves = scene_curves(track_list, frames)
+    jobs = chunk_jobs(curves, frames, size, chunk_frames, out_dir)
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in ordered_results(pool, render_chunk, jobs, 2 * workers):
+            if sink is not None:
+                sink.write(result)
+    return len(frames)
+
+def ffmpeg_sink(path, size, frame_start, fps=FPS, audio=None):
+    """ffmpeg process encoding raw rgb24 frames from its stdin into path"""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg not found on PATH, use --out or --raw instead")
+    cmd = [ffmpeg, "-y", "-loglevel", "error",
+           "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{size[0]}x{size[1]}",
+           "-r", str(fps), "-i", "-"]
+    if audio:
+        # frame f of the animation is at f / fps seconds of the song
+        cmd += ["-ss", f"{frame_start / fps:.3f}", "-i", str(audio), "-shortest"]
+    cmd += ["-pix_fmt", "yuv420p", str(path)]
+    return subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="headless schematic timing preview")
+    arg_parser.add_argument("midi_path")
+    group = arg_parser.add_mutually_exclusive_group()
+    group.add_argument("--out", help="write a PNG sequence into this directory (default: preview/)")
+    group.add_argument("--raw", help="write raw rgb24 frames to this file, - for stdout")
+    group.add_argument("--video", help="encode a video file with ffmpeg")
+    arg_parser.add_argument("--audio", help="audio track to mux into --video")
+    arg_parser.add_argument("--size", default=f"{SIZE[0]}x{SIZE[1]}", help="WIDTHxHEIGHT")
+    arg_parser.add_argument("--frame-start", type=int, default=1)
+    arg_parser.add_argument("--frame-end", type=int, default=None)
+    arg_parser.add_argument("--chunk-frames", type=int, default=CHUNK_FRAMES)
+    arg_parser.add_argument("--workers", type=int, default=None)
+    args = arg_parser.parse_args(argv)
+
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+    track_list = parse_midi_file(mido.MidiFile(args.midi_path))
+    options = dict(frame_start=args.frame_start, frame_end=args.frame_end, size=size,
+                   chunk_frames=args.chunk_frames, workers=args.workers)
+
+    started = time.perf_counter()
+    if args.video:
+        encoder = ffmpeg_sink(args.video, size, args.frame_start, audio=args.audio)
+        count = render_preview(track_list, sink=encoder.stdin, **options)
+        encoder.stdin.close()
+        if encoder.wait():
+            sys.exit(1)
+    elif args.raw:
+        if args.raw == "-":
+            count = render_preview(track_list, sink=sys.stdout.buffer, **options)
+        else:
+            with open(args.raw, "wb") as f:
+                count = render_preview(track_list, sink=f, **options)
+    else:
+        out_dir = Path(args.out or "preview")
+        out_dir.mkdir(parents=True, exist_ok=True)
+        count = render_preview(track_list, out_dir=str(out_dir), **options)
+
+    elapsed = time.perf_counter() - started
+    print(f"{count} frames in {elapsed:.1f}s ({count / elapsed:.0f} fps)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
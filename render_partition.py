@@ -0,0 +1,276 @@
+# render_partition.py
+#
+# Splits the song's frame range into render chunks of roughly equal cost
+# instead of equal length. Per-frame cost is estimated from the parsed
+# track_list and the instrument mappings (moving objects, glows, lasers),
+# then an optimal linear partition minimises the slowest chunk.
+# Runs outside Blender:
+#
+#   python render_partition.py solarpunkFIN.mid --nodes 8 --manifest chunks.json
+#   python render_partition.py solarpunkFIN.mid --nodes 4 --workers 4 \
+#       --run "blender -b MMscene.blend -s {start} -e {end} -a"
+
+import argparse
+import json
+import shlex
+import subprocess
+import sys
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+VENDOR_DIR = PROJECT_ROOT / "vendor"
+
+for p in (PROJECT_ROOT, VENDOR_DIR):
+    sp = str(p)
+    if sp not in sys.path:
+        sys.path.insert(0, sp)
+
+import mido
+from instruments import MAPPED_PITCHES, TRACK_IDS
+from parser import parse_midi_file
+
+# relative cost of one frame for each kind of animated thing
+BASE_COST = 20   # static scene, paid by every frame
+MOVING = 1       # object transform keyframed on this frame
+SHAPE_KEY = 2    # deforming mesh (harp strings)
+GLOW = 3         # emission above rest strength
+LASER = 4        # visible laser beam
+
+# frames each animator touches per note, mirroring the keyframe offsets in
+# blender_anim.py: (frames before note start, anchor, frames after anchor, cost)
+# where anchor is "start" or "end" of the note
+ENVELOPES = {
+    "drums": [
+        (16, "start", 10, MOVING),   # animate_drum_hammer
+        (0, "start", 6, MOVING),     # animate_drum_body
+    ],
+    "harp": [
+        (24, "start", 16, MOVING),   # animate_hammer_harp
+        (1, "start", 18, SHAPE_KEY), # animate_string_vibrate_2keys (cycles=4, step=2)
+    ],
+    "organ": [
+        (6, "end", 6, MOVING),       # animate_piston
+        (6, "end", 6, GLOW),         # animate_glow
+    ],
+    "bass": [
+        (6, "end", 6, GLOW),         # animate_glow
+    ],
+    "trumpet": [
+        (3, "end", 3, 2 * MOVING),   # Gyro_X + Gyro_Z
+        (0, "end", 0, LASER),        # Beam visibility
+    ],
+}
+
+### COST MODEL ###
+def animated_intervals(track_list, track_ids=TRACK_IDS):
+    """Yield (first_frame, last_frame, cost) for every animated object span"""
+    for name, track_id in track_ids.items():
+        instrument = name.split(".")[0]
+        if track_id >= len(track_list):
+            continue
+
+        pitches = MAPPED_PITCHES[instrument]
+        for note in track_list[track_id]:
+            if pitches is not None and note.pitch not in pitches:
+                continue
+            for before, anchor, after, cost in ENVELOPES[instrument]:
+                anchor_frame = note.start_frame if anchor == "start" else note.end_frame
+                yield note.start_frame - before, anchor_frame + after, cost
+
+def frame_costs(track_list, frame_start=1, frame_end=None, base_cost=BASE_COST):
+    """
+    Estimate the render cost of every frame in [frame_start, frame_end]
+
+    Returns (frame_end, costs) where costs[i] is the cost of frame_start + i.
+    Spans are accumulated in a difference array, so this is linear in
+    notes + frames.
+    """
+    intervals = list(animated_intervals(track_list))
+    if frame_end is None:
+        frame_end = max((last for _, last, _ in intervals), default=frame_start)
+
+    num_frames = frame_end - frame_start + 1
+    diff = [0] * (num_frames + 1)
+    for first, last, cost in intervals:
+        first = max(first, frame_start) - frame_start
+        last = min(last, frame_end) - frame_start
+        if first > last:
+            continue
+        diff[first] += cost
+        diff[last + 1] -= cost
+
+    costs = []
+    running = base_cost
+    for d in diff[:-1]:
+        running += d
+        costs.append(running)
+    return frame_end, costs
+
+### PARTITIONING ###
+def prefix_sums(costs):
+    sums = [0]
+    for c in costs:
+        sums.append(sums[-1] + c)
+    return sums
+
+def greedy_chunks(sums, limit):
+    """Cut [0, n) into as few chunks as possible with cost <= limit each"""
+    n = len(sums) - 1
+    bounds = []
+    i = 0
+    while i < n:
+        j = bisect_right(sums, sums[i] + limit) - 1
+        bounds.append((i, j))
+        i = j
+    return bounds
+
+def linear_partition(costs, num_chunks):
+    """
+    Split costs into at most num_chunks contiguous (start, end) index ranges
+    minimising the most expensive chunk
+
+    Costs are integers, so binary searching the smallest feasible limit
+    with a greedy check gives the optimal partition.
+    """
+    if not costs:
+        return []
+    sums = prefix_sums(costs)
+
+    lo, hi = max(costs), sums[-1]
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if len(greedy_chunks(sums, mid)) <= num_chunks:
+            hi = mid
+        else:
+            lo = mid + 1
+    bounds = greedy_chunks(sums, lo)
+
+    # use every node: splitting the heaviest chunk never raises the max
+    while len(bounds) < num_chunks:
+        splittable = [b for b in bounds if b[1] - b[0] > 1]
+        if not splittable:
+            break
+        start, end = max(splittable, key=lambda b: sums[b[1]] - sums[b[0]])
+        half = sums[start] + (sums[end] - sums[start]) / 2
+        cut = min(max(bisect_right(sums, half) - 1, start + 1), end - 1)
+        i = bounds.index((start, end))
+        bounds[i:i + 1] = [(start, cut), (cut, end)]
+    return bounds
+
+def equal_partition(num_frames, num_chunks):
+    """The naive split: equal frame counts per chunk"""
+    step = -(-num_frames // num_chunks)
+    return [(i, min(i + step, num_frames)) for i in range(0, num_frames, step)]
+
+def build_manifest(track_list, nodes, frame_start=1, frame_end=None):
+    """Chunk manifest (frame ranges per node) for rendering track_list on nodes"""
+    if nodes < 1:
+        raise ValueError(f"nodes must be at least 1, got {nodes}")
+    frame_end, costs = frame_costs(track_list, frame_start, frame_end)
+    if frame_end < frame_start:
+        raise ValueError(f"frame_end ({frame_end}) is before frame_start ({frame_start})")
+    sums = prefix_sums(costs)
+
+    def describe(bounds):
+        return [
+            {
+                "node": i,
+                "frame_start": frame_start + start,
+                "frame_end": frame_start + end - 1,
+                "cost": sums[end] - sums[start],
+            }
+            for i, (start, end) in enumerate(bounds)
+        ]
+
+    chunks = describe(linear_partition(costs, nodes))
+    naive = describe(equal_partition(len(costs), nodes))
+    return {
+        "frame_start": frame_start,
+        "frame_end": frame_end,
+        "nodes": nodes,
+        "total_cost": sums[-1],
+        "max_chunk_cost": max(c["cost"] for c in chunks),
+        "naive_max_chunk_cost": max(c["cost"] for c in naive),
+        "chunks": chunks,
+    }
+
+### LOCAL SCHEDULER ###
+def chunk_args(command, chunk):
+    """
+    Split command and fill in the chunk's {start}, {end} and {node}
+
+    Only those tokens are replaced, other braces (e.g. in a --python-expr
+    or JSON argument) are passed through unchanged.
+    """
+    tokens = {
+        "{start}": str(chunk["frame_start"]),
+        "{end}": str(chunk["frame_end"]),
+        "{node}": str(chunk["node"]),
+    }
+    args = []
+    for arg in shlex.split(command):
+        for token, value in tokens.items():
+            arg = arg.replace(token, value)
+        args.append(arg)
+    return args
+
+def run_chunks(chunks, command, workers):
+    """
+    Run command once per chunk on a pool of local worker processes
+
+    command is a template with {start}, {end} and {node} placeholders.
+    The most expensive chunks are dispatched first. Returns the exit codes
+    in chunk order.
+    """
+    def run(chunk):
+        args = chunk_args(command, chunk)
+        print(f"[node {chunk['node']}] frames {chunk['frame_start']}-{chunk['frame_end']}")
+        return chunk["node"], subprocess.run(args).returncode
+
+    order = sorted(chunks, key=lambda c: c["cost"], reverse=True)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        codes = dict(pool.map(run, order))
+    return [codes[c["node"]] for c in chunks]
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="cost-balanced render chunks")
+    arg_parser.add_argument("midi_path")
+    arg_parser.add_argument("--nodes", type=int, required=True)
+    arg_parser.add_argument("--frame-start", type=int, default=1)
+    arg_parser.add_argument("--frame-end", type=int, default=None)
+    arg_parser.add_argument("--manifest", help="write the chunk manifest to this JSON file")
+    arg_parser.add_argument("--run", help="command template to run per chunk, e.g. "
+                            "\"blender -b scene.blend -s {start} -e {end} -a\"")
+    arg_parser.add_argument("--workers", type=int, default=None,
+                            help="local worker processes for --run (default: nodes)")
+    args = arg_parser.parse_args(argv)
+    if args.nodes < 1:
+        arg_parser.error("--nodes must be at least 1")
+    if args.frame_end is not None and args.frame_end < args.frame_start:
+        arg_parser.error("--frame-end must not be before --frame-start")
+
+    track_list = parse_midi_file(mido.MidiFile(args.midi_path))
+    try:
+        manifest = build_manifest(track_list, args.nodes, args.frame_start, args.frame_end)
+    except ValueError as e:
+        # e.g. --frame-start after the last animated frame
+        arg_parser.error(str(e))
+
+    for c in manifest["chunks"]:
+        print(f"node {c['node']}: frames {c['frame_start']}-{c['frame_end']} cost {c['cost']}")
+    print(f"max chunk cost {manifest['max_chunk_cost']} "
+          f"(equal frame ranges: {manifest['naive_max_chunk_cost']})")
+
+    if args.manifest:
+        with open(args.manifest, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    if args.run:
+        codes = run_chunks(manifest["chunks"], args.run, args.workers or args.nodes)
+        if any(codes):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+# stem_export.py
+#
+# Writes per-instrument MIDI stems for the audio team straight from note
+# arrays, without building mido Message objects or going through
+# MidiFile.save. Every stem is a type 1 file: a conductor track (tempo and
+# time signature from the source) plus one note track. Note offs are written
+# as note_on with velocity 0, so the whole track shares one status byte and
+# running status drops it after the first event.
+# Runs outside Blender (needs numpy):
+#
+#   python stem_export.py solarpunkFIN.mid --out stems/
+#   python stem_export.py album/*.mid --out stems/ --all-pitches --workers 8
+#
+# By default stems keep only the pitches the animators map (instruments.py).
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+VENDOR_DIR = PROJECT_ROOT / "vendor"
+
+for p in (PROJECT_ROOT, VENDOR_DIR):
+    sp = str(p)
+    if sp not in sys.path:
+        sys.path.insert(0, sp)
+
+import mido
+from instruments import MAPPED_PITCHES, TRACK_IDS
+from parser import get_tempo_map, get_time_signatures, parse_midi_file
+
+NOTE_ON = 0x90
+DRUM_CHANNEL = 9      # General MIDI percussion
+END_OF_TRACK = b"\x00\xff\x2f\x00"
+
+### ENCODING ###
+def note_arrays(notes, pitches=None, offset_ticks=0):
+    """
+    Columns (start_tick, end_tick, pitch, velocity) of notes as int64 arrays
+
+    Notes whose pitch is not in pitches (None = keep all) are dropped. offset_ticks
+    shifts every note, notes that would start before tick 0 are dropped.
+    """
+    if pitches is not None:
+        notes = [n for n in notes if n.pitch in pitches]
+    cols = np.array([(n.start_tick, n.end_tick, n.pitch, n.velocity) for n in notes],
+                    dtype=np.int64).reshape(-1, 4)
+    cols[:, :2] += offset_ticks
+    cols = cols[cols[:, 0] >= 0]
+    return tuple(cols[:, i] for i in range(4))
+
+def encode_vlq(values):
+    """
+    Variable-length quantities of values (< 2**28) as a (n, 4) byte matrix
+    and a mask of the bytes in use; row i masked is the encoding of values[i]
+    """
+    values = np.asarray(values, dtype=np.int64)
+    if len(values) and (values.min() < 0 or values.max() >= 1 << 28):
+        raise ValueError("delta time out of range for a MIDI file")
+
+    # column 3 holds the lowest 7 bits, earlier columns get the continuation bit
+    shifts = np.array([21, 14, 7, 0])
+    groups = (values[:, None] >> shifts) & 0x7f
+    groups[:, :3] |= 0x80
+
+    num_bytes = 1 + (values >= 1 << 7) + (values >= 1 << 14) + (values >= 1 << 21)
+    mask = np.arange(4)[None, :] >= 4 - num_bytes[:, None]
+    return groups.astype(np.uint8), mask
+
+def encode_events(ticks, matrix, mask):
+    """
+    Encode events sorted by tick as delta times followed by their data bytes
+
+    matrix is (n, k) uint8 with one event per row, mask marks the bytes of
+    each row to emit. Returns the encoded bytes.
+    """
+    deltas = np.diff(ticks, prepend=0)
+    vlq, vlq_mask = encode_vlq(deltas)
+    rows = np.hstack([vlq, matrix])
+    keep = np.hstack([vlq_mask, mask])
+    return rows[keep].tobytes()
+
+def encode_notes(start, end, pitch, velocity, channel=0):
+    """
+    Encode note arrays as a running status note_on / note_on(velocity 0) stream
+
+    Offs sort before ons on the same tick, except the off of a zero length
+    note, which has to follow its own on.
+    """
+    n = len(start)
+    ticks = np.concatenate([start, end])
+    is_on = np.arange(2 * n) < n
+    zero_length = np.tile(start == end, 2)
+    order_in_tick = np.where(is_on, 1, np.where(zero_length, 2, 0))
+    order = np.lexsort((order_in_tick, ticks))
+
+    status = np.full(2 * n, NOTE_ON | channel, dtype=np.uint8)
+    notes = np.concatenate([pitch, pitch])[order].astype(np.uint8)
+    velocities = np.concatenate([np.clip(velocity, 1, 127),
+                                 np.zeros(n, dtype=np.int64)])[order].astype(np.uint8)
+
+    # running status: the status byte only goes out when it changes
+    status_changed = np.ones(2 * n, dtype=bool)
+    status_changed[1:] = status[1:] != status[:-1]
+
+    matrix = np.column_stack([status, notes, velocities])
+    mask = np.column_stack([status_changed, np.ones((2 * n, 2), dtype=bool)])
+    return encode_events(ticks[order], matrix, mask)
+
+def encode_meta(ticks, meta_types, payloads):
+    """Encode tick sorted meta events with short (< 128 byte) payloads"""
+    width = 3 + max((len(p) for p in payloads), default=0)
+    matrix = np.zeros((len(ticks), width), dtype=np.uint8)
+    mask = np.zeros((len(ticks), width), dtype=bool)
+    for i, (meta_type, payload) in enumerate(zip(meta_types, payloads)):
+        matrix[i, :3 + len(payload)] = (0xff, meta_type, len(payload)) + tuple(payload)
+        mask[i, :3 + len(payload)] = True
+    return encode_events(np.asarray(ticks, dtype=np.int64), matrix, mask)
+
+def track_name_event(name):
+    data = name.encode("latin1", errors="replace")[:127]
+    return b"\x00\xff\x03" + bytes([len(data)]) + data
+
+def track_chunk(body, name=None):
+    """Complete MTrk chunk: optional name, body, end of track"""
+    head = track_name_event(name) if name else b""
+    data = head + body + END_OF_TRACK
+    return b"MTrk" + len(data).to_bytes(4, "big") + data
+
+def conductor_track(mid):
+    """Conductor track body with the source file's tempo map and time signatures"""
+    tempo_map = get_tempo_map(mid)
+    signatures = get_time_signatures(mid)
+
+    # (tick, meta type, payload) with 0x51 = set_tempo, 0x58 = time_signature
+    events = [(tick, 0x51, tempo.to_bytes(3, "big")) for tick, tempo in tempo_map]
+    for tick, num, den, clocks, notated in signatures:
+        events.append((tick, 0x58, bytes([num, den.bit_length() - 1, clocks, notated])))
+    events.sort(key=lambda e: (e[0], e[1]))
+    return encode_meta(*zip(*events)) if events else b""
+
+def write_midi_file(path, track_chunks, ticks_per_beat):
+    """Write a type 1 file from encoded track chunks with a single write"""
+    header = (b"MThd" + (6).to_bytes(4, "big") + (1).to_bytes(2, "big")
+              + len(track_chunks).to_bytes(2, "big") + ticks_per_beat.to_bytes(2, "big"))
+    with open(path, "wb") as f:
+        f.write(b"".join([header] + track_chunks))
+
+### STEMS ###
+def stem_jobs(midi_path, out_dir, mapped_only=True, offset_ticks=0, track_ids=TRACK_IDS):
+    """
+    Parse one MIDI file and return a job (see write_stem) per instrument stem
+
+    Runs in a worker process, jobs only hold arrays and bytes so they are
+    cheap to send back.
+    """
+    mid = mido.MidiFile(midi_path)
+    track_list = parse_midi_file(mid)
+    conductor = track_chunk(conductor_track(mid))
+
+    jobs = []
+    for name, track_id in track_ids.items():
+        if track_id >= len(track_list):
+            print(f"[WARN] {midi_path}: no track {track_id} for {name}, skipping.")
+            continue
+        instrument = name.split(".")[0]
+        pitches = MAPPED_PITCHES[instrument] if mapped_only else None
+        jobs.append({
+            "path": os.path.join(out_dir, f"{Path(midi_path).stem}_{name}.mid"),
+            "name": name,
+            "channel": DRUM_CHANNEL if instrument == "drums" else 0,
+            "ticks_per_beat": mid.ticks_per_beat,
+            "conductor": conductor,
+            "notes": note_arrays(track_list[track_id], pitches, offset_ticks),
+        })
+    return jobs
+
+def write_stem(job):
+    """Encode and write one stem, returns (path, note count)"""
+    body = encode_notes(*job["notes"], channel=job["channel"])
+    chunks = [job["conductor"], track_chunk(body, job["name"])]
+    write_midi_file(job["path"], chunks, job["ticks_per_beat"])
+    return job["path"], len(job["notes"][0])
+
+def export_stems(midi_paths, out_dir, mapped_only=True, offset_ticks=0, workers=None):
+    """
+    Export the instrument stems of every file in midi_paths into out_dir
+
+    Files are parsed and stems encoded on a pool of worker processes.
+    Returns [(stem_path, note_count), ...].
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = []
+        for file_jobs in pool.map(stem_jobs, midi_paths, [out_dir] * len(midi_paths),
+                                  [mapped_only] * len(midi_paths),
+                                  [offset_ticks] * len(midi_paths)):
+            jobs.extend(file_jobs)
+        return list(pool.map(write_stem, jobs))
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="export per-instrument MIDI stems")
+    arg_parser.add_argument("midi_paths", nargs="+")
+    arg_parser.add_argument("--out", default="stems")
+    arg_parser.add_argument("--all-pitches", action="store_true",
+                            help="keep pitches the animators do not map")
+    arg_parser.add_argument("--offset-ticks", type=int, default=0,
+                            help="shift every note by this many ticks")
+    arg_parser.add_argument("--workers", type=int, default=None)
+    args = arg_parser.parse_args(argv)
+
+    written = export_stems(args.midi_paths, args.out, not args.all_pitches,
+                           args.offset_ticks, args.workers)
+    for path, count in written:
+        print(f"{path}: {count} notes")
+
+if __name__ == "__main__":
+    main()
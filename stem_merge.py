@@ -0,0 +1,234 @@
+# stem_merge.py
+#
+# Loads separately delivered instrument stems onto one timeline, in the
+# track_list shape parse_midi_file returns (track_list[TRACK_IDS[name]] holds
+# that instrument's notes), so blender_anim can animate them without merging
+# the stems in a DAW first. A manifest lists the stems:
+#
+#   {
+#     "ppq": 960,             # optional, default: highest ticks_per_beat of the stems
+#     "conductor": 0,         # optional, stem whose tempo map / time signatures are used
+#     "stems": [
+#       {"path": "drums.mid", "instrument": "drums"},
+#       {"path": "lead.mid", "instrument": "trumpet.001", "offset": 2.5, "track": 1}
+#     ]
+#   }
+#
+# offset (seconds) moves a stem's notes on the timeline, track picks a single
+# track of the stem (default: all of them). Stems keep their own tempo maps
+# and resolutions: every note is placed by the time it sounds in its stem,
+# then converted to ticks of the common resolution on the conductor's tempo
+# map. Stems are merged per instrument with a k-way merge of their
+# start-ordered note streams; the CLI decodes them in parallel (inside
+# Blender they are decoded in-process). Runs inside or outside Blender:
+#
+#   python stem_merge.py album/song1.json                    # summary
+#   python stem_merge.py album/song1.json --out song1.mid    # merged MIDI for main.py
+
+import argparse
+import heapq
+import json
+import sys
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+VENDOR_DIR = PROJECT_ROOT / "vendor"
+
+for p in (PROJECT_ROOT, VENDOR_DIR):
+    sp = str(p)
+    if sp not in sys.path:
+        sys.path.insert(0, sp)
+
+import mido
+from mido.midifiles.midifiles import DEFAULT_TEMPO
+from instruments import TRACK_IDS
+from notes import Note
+from parser import get_tempo_map, get_time_signatures, iter_track_notes
+
+FPS = 24
+
+### TEMPO MAPS ###
+def tempo_segments(tempo_map, ticks_per_beat):
+    """
+    Stretches of constant tempo as parallel lists (ticks, seconds, tempos) of
+    where each starts, beginning at tick 0 (120 bpm until the first set_tempo)
+    """
+    ticks, seconds, tempos = [0], [0.0], [DEFAULT_TEMPO]
+    for tick, tempo in tempo_map:
+        if tick == ticks[-1]:
+            tempos[-1] = tempo
+            continue
+        seconds.append(seconds[-1] + mido.tick2second(tick - ticks[-1], ticks_per_beat, tempos[-1]))
+        ticks.append(tick)
+        tempos.append(tempo)
+    return ticks, seconds, tempos
+
+def tick_to_second(tick, segments, ticks_per_beat):
+    ticks, seconds, tempos = segments
+    i = bisect_right(ticks, tick) - 1
+    return seconds[i] + mido.tick2second(tick - ticks[i], ticks_per_beat, tempos[i])
+
+def second_to_tick(second, segments, ticks_per_beat):
+    ticks, seconds, tempos = segments
+    i = max(bisect_right(seconds, second) - 1, 0)
+    return ticks[i] + round(mido.second2tick(second - seconds[i], ticks_per_beat, tempos[i]))
+
+### DECODING ###
+def decode_stem(stem):
+    """
+    Decode one stem in a worker process
+
+    Returns its ticks_per_beat, tempo map, time signatures and the notes as
+    start-ordered (start second, end second, pitch, velocity) tuples with the
+    stem's offset applied; notes moved before 0 are dropped.
+    """
+    mid = mido.MidiFile(stem["path"])
+    tempo_map = get_tempo_map(mid)
+    segments = tempo_segments(tempo_map, mid.ticks_per_beat)
+    tracks = mid.tracks if stem.get("track") is None else [mid.tracks[stem["track"]]]
+
+    # the tempo passed here only fills in the Note fields, which are recomputed below;
+    # the whole stem is in memory anyway, so notes are not capped (same as parse_track)
+    streams = [iter_track_notes(track, mid.ticks_per_beat, DEFAULT_TEMPO, max_note_beats=float("inf"))
+               for track in tracks]
+    offset = stem.get("offset", 0.0)
+    notes = []
+    for note in heapq.merge(*streams, key=lambda n: n.start_tick):
+        start = tick_to_second(note.start_tick, segments, mid.ticks_per_beat) + offset
+        if start < 0:
+            continue
+        end = tick_to_second(note.end_tick, segments, mid.ticks_per_beat) + offset
+        notes.append((start, end, note.pitch, note.velocity))
+
+    return {
+        "ticks_per_beat": mid.ticks_per_beat,
+        "tempo_map": tempo_map,
+        "time_signatures": get_time_signatures(mid),
+        "notes": notes,
+    }
+
+def decode_stems(stems, workers=None):
+    """decode_stem for every stem, on worker processes unless workers == 1"""
+    if workers == 1:
+        return [decode_stem(stem) for stem in stems]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(decode_stem, stems))
+
+### MERGING ###
+def conductor_midi(decoded, ppq):
+    """
+    Conductor-only MidiFile (tempo map and time signatures at ppq) for the
+    code that reads them from a MidiFile, e.g. patterns.bar_windows
+    """
+    scale = ppq / decoded["ticks_per_beat"]
+    events = [(round(tick * scale), mido.MetaMessage("set_tempo", tempo=tempo))
+              for tick, tempo in decoded["tempo_map"]]
+    for tick, num, den, clocks, notated in decoded["time_signatures"]:
+        events.append((round(tick * scale), mido.MetaMessage(
+            "time_signature", numerator=num, denominator=den,
+            clocks_per_click=clocks, notated_32nd_notes_per_beat=notated)))
+    events.sort(key=lambda e: e[0])
+
+    track = mido.MidiTrack()
+    now = 0
+    for tick, msg in events:
+        track.append(msg.copy(time=tick - now))
+        now = tick
+    return mido.MidiFile(type=1, ticks_per_beat=ppq, tracks=[track])
+
+def merge_stems(stems, decoded, ppq=None, conductor=0, fps=FPS, track_ids=TRACK_IDS):
+    """
+    Merge decoded stems into (conductor MidiFile, track_list)
+
+    Each instrument's stems are already start-ordered, so they are combined
+    with a k-way merge (stable: ties keep manifest order) instead of sorting.
+    Frames come from the seconds on the conductor's tempo map, which matches
+    parse_midi_file for a constant tempo.
+    """
+    if ppq is None:
+        ppq = max(d["ticks_per_beat"] for d in decoded)
+    mid = conductor_midi(decoded[conductor], ppq)
+    segments = tempo_segments(get_tempo_map(mid), ppq)
+
+    by_instrument = {}
+    for stem, d in zip(stems, decoded):
+        if stem["instrument"] not in track_ids:
+            print(f"[WARN] {stem['path']}: unknown instrument {stem['instrument']!r}, skipping.")
+            continue
+        by_instrument.setdefault(stem["instrument"], []).append(d["notes"])
+
+    track_list = [[] for _ in range(max(track_ids.values()) + 1)]
+    for instrument, streams in by_instrument.items():
+        track_list[track_ids[instrument]] = [
+            Note(
+                start_tick=second_to_tick(start, segments, ppq),
+                end_tick=second_to_tick(end, segments, ppq),
+                pitch=pitch,
+                velocity=velocity,
+                start_sec=start,
+                end_sec=end,
+                start_frame=int(round(start * fps)),
+                end_frame=int(round(end * fps)),
+            )
+            for start, end, pitch, velocity in heapq.merge(*streams, key=itemgetter(0))
+        ]
+    return mid, track_list
+
+def load_stems(stems, ppq=None, conductor=0, fps=FPS, workers=1, track_ids=TRACK_IDS):
+    """
+    Decode and merge stems ([{"path", "instrument", "offset", "track"}, ...])
+
+    workers=1 (the default, safe inside Blender) decodes in this process,
+    anything else on a process pool (None = one per CPU). Returns
+    (conductor MidiFile, track_list).
+    """
+    decoded = decode_stems(stems, workers)
+    return merge_stems(stems, decoded, ppq, conductor, fps, track_ids)
+
+def read_manifest(path):
+    """Stems and options of a manifest, stem paths resolved against its directory"""
+    with open(path) as f:
+        manifest = json.load(f)
+    base = Path(path).resolve().parent
+    stems = [dict(stem, path=str(base / stem["path"])) for stem in manifest["stems"]]
+    return stems, manifest.get("ppq"), manifest.get("conductor", 0)
+
+def load_manifest(path, fps=FPS, workers=1, track_ids=TRACK_IDS):
+    """load_stems for a manifest file"""
+    stems, ppq, conductor = read_manifest(path)
+    return load_stems(stems, ppq, conductor, fps, workers, track_ids)
+
+### OUTPUT ###
+def write_merged(path, mid, track_list):
+    """Write the merged timeline as one type 1 file (conductor + a track per track_list entry)"""
+    from stem_export import conductor_track, encode_notes, note_arrays, track_chunk, write_midi_file
+
+    chunks = [track_chunk(conductor_track(mid))]
+    names = {track_id: name for name, track_id in TRACK_IDS.items()}
+    for track_id, notes in enumerate(track_list[1:], start=1):
+        chunks.append(track_chunk(encode_notes(*note_arrays(notes)), names.get(track_id)))
+    write_midi_file(path, chunks, mid.ticks_per_beat)
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="merge instrument stems onto one timeline")
+    arg_parser.add_argument("manifest")
+    arg_parser.add_argument("--out", help="write the merged timeline as a MIDI file")
+    arg_parser.add_argument("--workers", type=int, default=None,
+                            help="decoding processes (default: one per CPU)")
+    args = arg_parser.parse_args(argv)
+
+    mid, track_list = load_manifest(args.manifest, workers=args.workers)
+    for name, track_id in TRACK_IDS.items():
+        notes = track_list[track_id]
+        if notes:
+            print(f"{name:<12} track {track_id}: {len(notes):>6} notes, "
+                  f"frames {notes[0].start_frame}-{max(n.end_frame for n in notes)}")
+    if args.out:
+        write_merged(args.out, mid, track_list)
+        print(f"wrote {args.out} ({mid.ticks_per_beat} ticks per beat)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# stream.py
+#
+# Streaming replacement for mido.MidiFile + parser.parse_midi_file, for
+# multi-hour recordings that don't fit in memory as message and Note lists.
+# Every track is decoded incrementally from its own file handle, notes are
+# paired on the fly (parser.iter_track_notes) and handed out either as one
+# time-ordered stream or in fixed-size frame windows for the animators:
+#
+#   for frame_start, frame_end, track_list, next_starts in stream_windows(path):
+#       ...  # track_list has the same shape as parse_midi_file's, but only
+#            # holds the notes starting in [frame_start, frame_end)
+#
+# Peak memory depends on the window size and polyphony, not the song length.
+# Notes, frames and tempo match parse_midi_file exactly, except that notes held
+# longer than parser.MAX_NOTE_BEATS end at that limit. This can be checked on a
+# file outside Blender:
+#
+#   python stream.py solarpunkFIN.mid
+
+import heapq
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+VENDOR_DIR = PROJECT_ROOT / "vendor"
+
+for p in (PROJECT_ROOT, VENDOR_DIR):
+    sp = str(p)
+    if sp not in sys.path:
+        sys.path.insert(0, sp)
+
+import mido
+from mido.midifiles.midifiles import (
+    DEFAULT_TEMPO,
+    iter_track,
+    read_chunk_header,
+    read_file_header,
+)
+
+from parser import MAX_NOTE_BEATS, get_tempo, iter_track_notes, make_note, parse_midi_file
+
+WINDOW_FRAMES = 240  # 10 seconds at 24 fps
+
+### DECODING ###
+def track_offsets(path):
+    """Return (ticks_per_beat, [file offset of each MTrk chunk])"""
+    offsets = []
+    with open(path, "rb") as f:
+        _, num_tracks, ticks_per_beat = read_file_header(f)
+        for _ in range(num_tracks):
+            offset = f.tell()
+            try:
+                _, size = read_chunk_header(f)
+            except EOFError:
+                break
+            offsets.append(offset)
+            f.seek(size, 1)
+    return ticks_per_beat, offsets
+
+def track_messages(path, offset):
+    """Yield the messages of the track chunk at offset, decoded as they are read"""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        yield from iter_track(f)
+
+def stream_tempo(path, offsets):
+    """Same tempo as parser.get_tempo (first set_tempo, in track order)"""
+    for offset in offsets:
+        for msg in track_messages(path, offset):
+            if msg.type == 'set_tempo':
+                return msg.tempo
+    return DEFAULT_TEMPO
+
+def track_note_streams(path, warn=True):
+    """
+    One start-ordered Note generator per track (same tracks as parse_midi_file)
+
+    warn=False skips the warnings for notes capped at MAX_NOTE_BEATS.
+    """
+    ticks_per_beat, offsets = track_offsets(path)
+    tempo = stream_tempo(path, offsets)
+    return [iter_track_notes(track_messages(path, offset), ticks_per_beat, tempo, warn=warn)
+            for offset in offsets]
+
+### STREAMS ###
+def _tagged(i, notes):
+    """(start tick, track index, Note) for every note of track i"""
+    for note in notes:
+        yield note.start_tick, i, note
+
+def stream_notes(path, warn=True):
+    """Yield (track index, Note) for every note in the file, ordered by start"""
+    streams = [_tagged(i, notes) for i, notes in enumerate(track_note_streams(path, warn))]
+    for _, i, note in heapq.merge(*streams, key=lambda item: item[:2]):
+        yield i, note
+
+def stream_windows(path, window_frames=WINDOW_FRAMES, warn=True):
+    """
+    Yield (frame_start, frame_end, track_list, next_starts) per frame window
+
+    track_list holds, per track, the notes starting in [frame_start, frame_end),
+    next_starts the start frame of each track's next note after the window
+    (None at the end). Windows are aligned to window_frames, windows without
+    notes are skipped.
+    """
+    streams = track_note_streams(path, warn)
+    lookahead = [next(notes, None) for notes in streams]
+
+    while any(note is not None for note in lookahead):
+        first = min(note.start_frame for note in lookahead if note is not None)
+        frame_start = first - first % window_frames
+        frame_end = frame_start + window_frames
+
+        track_list = []
+        for i, notes in enumerate(streams):
+            window = []
+            while lookahead[i] is not None and lookahead[i].start_frame < frame_end:
+                window.append(lookahead[i])
+                lookahead[i] = next(notes, None)
+            track_list.append(window)
+
+        next_starts = [None if note is None else note.start_frame for note in lookahead]
+        yield frame_start, frame_end, track_list, next_starts
+
+### CHECK ###
+def check(path):
+    """
+    Compare stream_notes and stream_windows with parse_midi_file on path
+
+    Notes longer than MAX_NOTE_BEATS are expected to end at the limit.
+    Returns a list of mismatch descriptions (empty if everything matches).
+    """
+    def key(note):
+        return (note.start_tick, note.end_tick, note.pitch, note.velocity,
+                note.start_frame, note.end_frame)
+
+    mid = mido.MidiFile(path)
+    tempo = get_tempo(mid)
+    max_note_ticks = MAX_NOTE_BEATS * mid.ticks_per_beat
+
+    def capped(note):
+        if note.end_tick - note.start_tick <= max_note_ticks:
+            return note
+        return make_note(note.start_tick, note.start_tick + max_note_ticks, note.pitch,
+                         note.velocity, mid.ticks_per_beat, tempo)
+
+    expected = [sorted(key(capped(note)) for note in notes) for notes in parse_midi_file(mid)]
+    problems = []
+
+    streamed = [[] for _ in expected]
+    for i, note in stream_notes(path):
+        if i >= len(streamed):
+            problems.append(f"stream_notes: track index {i} out of range")
+            continue
+        streamed[i].append(key(note))
+    for i, (want, got) in enumerate(zip(expected, streamed)):
+        if sorted(got) != want:
+            problems.append(f"stream_notes: track {i} has {len(got)} notes, "
+                            f"parse_midi_file {len(want)} (or different notes)")
+
+    windowed = [[] for _ in expected]
+    # same notes again, their warnings were printed by stream_notes
+    for _, _, track_list, _ in stream_windows(path, warn=False):
+        for i, notes in enumerate(track_list):
+            windowed[i].extend(map(key, notes))
+    for i, (want, got) in enumerate(zip(expected, windowed)):
+        if sorted(got) != want:
+            problems.append(f"stream_windows: track {i} differs from parse_midi_file")
+    return problems
+
+def main(argv=None):
+    paths = sys.argv[1:] if argv is None else argv
+    failed = False
+    for path in paths:
+        problems = check(path)
+        for problem in problems:
+            print(f"[WARN] {path}: {problem}")
+        print(f"{path}: {'MISMATCH' if problems else 'ok'}")
+        failed = failed or bool(problems)
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
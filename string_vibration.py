@@ -0,0 +1,54 @@
+# string_vibration.py
+#
+# Analytic harp string vibration. Instead of keyframing every pluck, each
+# string keeps a sorted table of its hit frames and amplitudes, and the shape
+# key values for any frame are computed from a damped oscillator driven by
+# the most recent hits:
+#
+#   d(t) = sum over recent hits of  amp_i * exp(-(t - t_i) / decay) * cos(2 pi (t - t_i) / period)
+#
+# d > 0 bends the string with "Key 1", d < 0 with "Key 2" (same two shape keys
+# as animate_string_vibrate_2keys). No bpy here: blender_anim.py stores the
+# tables on the string objects and evaluates them in a frame change handler.
+
+from array import array
+from bisect import bisect_right
+from math import cos, exp, log, pi
+
+def hit_table(notes, amp, max_velocity=127):
+    """
+    Compact (frames, amplitudes) float arrays for a string's notes, sorted by frame
+
+    Amplitude scales with note velocity (max_velocity -> amp).
+    """
+    hits = sorted((n.start_frame, amp * n.velocity / max_velocity) for n in notes)
+    return array("f", [f for f, _ in hits]), array("f", [a for _, a in hits])
+
+def merge_hits(frames, amps, new_frames, new_amps):
+    """Merge two hit tables (e.g. from consecutive streaming windows)"""
+    hits = sorted(zip(list(frames) + list(new_frames), list(amps) + list(new_amps)))
+    return array("f", [f for f, _ in hits]), array("f", [a for _, a in hits])
+
+def displacement(frame, frames, amps, period, decay, cutoff=0.005):
+    """
+    String displacement at frame (may be fractional) from a sorted hit table
+
+    Only hits whose envelope is still above cutoff (relative to their
+    amplitude) contribute; they are found by binary search, so the cost
+    does not depend on the number of hits.
+    """
+    max_age = decay * log(1.0 / cutoff)
+    d = 0.0
+    i = bisect_right(frames, frame) - 1
+    while i >= 0:
+        age = frame - frames[i]
+        if age > max_age:
+            break
+        d += amps[i] * exp(-age / decay) * cos(2.0 * pi * age / period)
+        i -= 1
+    return d
+
+def shape_key_values(frame, frames, amps, period, decay, cutoff=0.005):
+    """(up, down) shape key values at frame, both >= 0"""
+    d = displacement(frame, frames, amps, period, decay, cutoff)
+    return (d, 0.0) if d >= 0.0 else (0.0, -d)
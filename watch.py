@@ -0,0 +1,269 @@
+# watch.py
+#
+# Watch mode for look development inside Blender. Instead of pressing
+# Run Script on main.py after every edit, start a watch session once:
+#
+#   import watch
+#   watch.start(MIDI_PATH)
+#
+# watch.start(MIDI_PATH, nla_patterns=True) animates drums and bass through
+# their NLA pattern animators, like NLA_PATTERNS in main.py.
+#
+# A Blender timer then polls the MIDI file and the project modules. Parsed
+# notes and per-stage fingerprints stay in memory, and on a change only the
+# instrument stages whose inputs actually changed are cleared and re-run:
+#
+#   MIDI file ----------> notes per track --+
+#   parser.py ----------^                   |
+#   instruments.py -----> stage config -----+--> stage (e.g. "harp")
+#   blender_anim.py ----> stage code -------+
+#   string_vibration.py -^
+#
+# e.g. editing HARP_PARAMS re-runs only the harp, and a new MIDI file is
+# reparsed but only instruments whose notes changed are re-animated.
+
+import hashlib
+import importlib
+import os
+
+import bpy
+import mido
+
+import blender_anim
+import instruments
+import parser
+import patterns
+import string_vibration
+
+POLL_INTERVAL = 1.0  # seconds between file checks
+
+# session state lives in the driver namespace so it survives re-running
+# main.py (which reloads this module)
+SESSION_KEY = "midi_machina_watch"
+
+# instrument stages: animator + kwargs, the helpers it calls (code: blender_anim
+# functions, or "module.function" for other modules), the instruments.py
+# settings it reads (config) and what to clear before a re-run;
+# stages with a pattern_animator use it (and pattern_code) with nla_patterns
+STAGES = {
+    "drums": {
+        "animator": "animate_drums",
+        "kwargs": {},
+        "code": ["animate_drums", "animate_drum_hammer", "animate_drum_body"],
+        "pattern_animator": "animate_drums_patterns",
+        "pattern_code": ["animate_drums_patterns", "animate_with_patterns", "_pattern_notes"],
+        "config": ["DRUM_MAPPING"],
+        "clear": [("clear_animation_for_objects", "DRUM_OBJECTS")],
+    },
+    "harp": {
+        "animator": "animate_harp",
+        "kwargs": {},
+        "code": ["animate_harp", "animate_hammer_harp", "animate_string_vibrate_2keys",
+                 "add_string_hits", "update_strings", "string_vibration.hit_table",
+                 "string_vibration.merge_hits", "string_vibration.displacement",
+                 "string_vibration.shape_key_values"],
+        "config": ["HARP_MAPPING", "HARP_PARAMS", "HARP_STRING_MODE", "HARP_STRING_MODEL"],
+        "clear": [("clear_animation_for_objects", "HARP_HAMMERS"),
+                  ("clear_animation_for_shapekeys", "HARP_STRINGS")],
+    },
+    "organ": {
+        "animator": "animate_organ",
+        "kwargs": {},
+        "code": ["animate_organ", "animate_piston", "animate_glow"],
+        "config": ["ORGAN_MAPPING"],
+        "clear": [("clear_animation_for_objects", "ORGAN_PISTONS"),
+                  ("clear_animation_for_glow", "ORGAN_FILAMENTS")],
+    },
+    "bass": {
+        "animator": "animate_bass",
+        "kwargs": {},
+        "code": ["animate_bass", "animate_glow"],
+        "pattern_animator": "animate_bass_patterns",
+        "pattern_code": ["animate_bass_patterns", "animate_with_patterns", "_pattern_notes"],
+        "config": ["BASS_MAPPING"],
+        "clear": [("clear_animation_for_glow", "BASS_OBJECTS")],
+    },
+    "trumpet.001": {
+        "animator": "animate_trumpet_laser",
+        "kwargs": {"obj_num": ".001"},
+        "code": ["animate_trumpet_laser", "map_pitch"],
+        "config": ["TRUMPET_PITCH_RANGE"],
+        "clear": [("clear_animation_for_objects", ["Gyro_X.001", "Gyro_Z.001", "Beam.001"])],
+    },
+    "trumpet.002": {
+        "animator": "animate_trumpet_laser",
+        "kwargs": {"obj_num": ".002"},
+        "code": ["animate_trumpet_laser", "map_pitch"],
+        "config": ["TRUMPET_PITCH_RANGE"],
+        "clear": [("clear_animation_for_objects", ["Gyro_X.002", "Gyro_Z.002", "Beam.002"])],
+    },
+}
+
+### FINGERPRINTS ###
+def file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def code_digest(code, h):
+    """Hash a code object (bytecode, names and constants, not line numbers)"""
+    h.update(code.co_code)
+    h.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            code_digest(const, h)
+        else:
+            h.update(repr(const).encode())
+
+def stage_function(name):
+    """Function named by a stage's code entry ("func" or "module.func")"""
+    module_name, _, func_name = name.rpartition(".")
+    module = globals()[module_name] if module_name else blender_anim
+    return getattr(module, func_name)
+
+def notes_digest(notes):
+    h = hashlib.sha1()
+    for n in notes:
+        h.update(repr((n.start_frame, n.end_frame, n.pitch, n.velocity)).encode())
+    return h.hexdigest()
+
+def uses_patterns(stage, windows):
+    return windows is not None and "pattern_animator" in stage
+
+def stage_digest(name, stage, notes_digests, windows=None):
+    """Fingerprint of everything a stage depends on (windows: NLA pattern bar windows)"""
+    h = hashlib.sha1()
+    for func_name in stage["code"]:
+        code_digest(stage_function(func_name).__code__, h)
+    if uses_patterns(stage, windows):
+        for func_name in stage["pattern_code"]:
+            code_digest(stage_function(func_name).__code__, h)
+        for func in (patterns.find_patterns, patterns.bar_ticks, patterns.bar_windows):
+            code_digest(func.__code__, h)
+        h.update(repr((patterns.REACH, windows)).encode())
+    for setting in stage["config"]:
+        h.update(repr(getattr(instruments, setting)).encode())
+    h.update(repr(stage["kwargs"]).encode())
+
+    track_id = instruments.TRACK_IDS[name]
+    h.update(notes_digests[track_id].encode() if track_id < len(notes_digests) else b"-")
+    return h.hexdigest()
+
+### SESSION ###
+class WatchSession:
+    """In-memory state of one watch session"""
+    def __init__(self, midi_path, nla_patterns=False):
+        self.midi_path = str(midi_path)
+        self.nla_patterns = nla_patterns
+        self.sources = {}       # path -> (mtime, sha1)
+        self.track_list = None
+        self.windows = None     # bar windows, only with nla_patterns
+        self.notes_digests = []
+        self.stage_digests = {} # stage name -> digest it was last run with
+
+    def _changed(self, path):
+        """True if path's content changed since the last check"""
+        mtime = os.path.getmtime(path)
+        old = self.sources.get(path)
+        if old is not None and old[0] == mtime:
+            return False
+
+        digest = file_digest(path)
+        self.sources[path] = (mtime, digest)
+        return old is None or old[1] != digest
+
+    def refresh_modules(self):
+        """Reload edited project modules, return True if parser or patterns changed"""
+        global blender_anim, instruments, parser, patterns, string_vibration
+
+        parser_changed = self._changed(parser.__file__)
+        if parser_changed:
+            parser = importlib.reload(parser)
+
+        instruments_changed = self._changed(instruments.__file__)
+        if instruments_changed:
+            instruments = importlib.reload(instruments)
+
+        # patterns and blender_anim import from the modules above, so reload them too
+        patterns_changed = self._changed(patterns.__file__)
+        if patterns_changed or parser_changed or instruments_changed:
+            patterns = importlib.reload(patterns)
+        string_vibration_changed = self._changed(string_vibration.__file__)
+        if string_vibration_changed:
+            string_vibration = importlib.reload(string_vibration)
+        if (self._changed(blender_anim.__file__) or instruments_changed or patterns_changed
+                or string_vibration_changed):
+            blender_anim = importlib.reload(blender_anim)
+
+        return parser_changed or patterns_changed
+
+    def refresh_notes(self, force=False):
+        if self._changed(self.midi_path) or force or self.track_list is None:
+            print(f"[watch] parsing {self.midi_path}")
+            mid = mido.MidiFile(self.midi_path)
+            self.track_list = parser.parse_midi_file(mid)
+            self.notes_digests = [notes_digest(notes) for notes in self.track_list]
+            if self.nla_patterns:
+                self.windows = patterns.bar_windows(mid, self.track_list)
+
+    def run_stage(self, name, stage):
+        for clear_func, objects in stage["clear"]:
+            if isinstance(objects, str):
+                objects = getattr(instruments, objects)
+            getattr(blender_anim, clear_func)(objects)
+
+        track_id = instruments.TRACK_IDS[name]
+        if uses_patterns(stage, self.windows):
+            animator = getattr(blender_anim, stage["pattern_animator"])
+            animator(track_list=self.track_list, track_id=track_id, windows=self.windows,
+                     **stage["kwargs"])
+        else:
+            animator = getattr(blender_anim, stage["animator"])
+            animator(track_list=self.track_list, track_id=track_id, **stage["kwargs"])
+
+    def update(self):
+        """Re-run every stage whose inputs changed, return the names run"""
+        parser_changed = self.refresh_modules()
+        self.refresh_notes(force=parser_changed)
+
+        ran = []
+        for name, stage in STAGES.items():
+            digest = stage_digest(name, stage, self.notes_digests, self.windows)
+            if self.stage_digests.get(name) == digest:
+                continue
+            self.run_stage(name, stage)
+            self.stage_digests[name] = digest
+            ran.append(name)
+
+        if ran:
+            print(f"[watch] re-animated: {', '.join(ran)}")
+        return ran
+
+def _make_poll(session):
+    def poll():
+        if bpy.app.driver_namespace.get(SESSION_KEY) is not session:
+            return None  # stopped or replaced: unregister this timer
+        try:
+            session.update()
+        except Exception as e:
+            # keep watching, the next save usually fixes it
+            print(f"[watch] update failed: {type(e).__name__}: {e}")
+        return POLL_INTERVAL
+    return poll
+
+def start(midi_path, nla_patterns=False):
+    """
+    Start (or restart) watching midi_path and the project modules
+
+    nla_patterns: animate drums and bass with NLA pattern strips (see patterns.py)
+    """
+    session = WatchSession(midi_path, nla_patterns)
+    bpy.app.driver_namespace[SESSION_KEY] = session
+    session.update()
+    bpy.app.timers.register(_make_poll(session), first_interval=POLL_INTERVAL,
+                            persistent=True)
+    print(f"[watch] watching {midi_path} (call watch.stop() to end)")
+    return session
+
+def stop():
+    """Stop the running watch session, its timer unregisters on the next tick"""
+    bpy.app.driver_namespace.pop(SESSION_KEY, None)